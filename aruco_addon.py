@@ -496,6 +496,10 @@ class ARUCO_OT_complete_import(Operator):
             if props.import_projector and markers_data:
                 projector_created = self.calculate_and_create_projector(markers_data, props)
             
+            # Объекты созданы через bpy.data без промежуточных обновлений -
+            # граф зависимостей пересчитывается один раз на весь импорт
+            context.view_layer.update()
+            
             # Результат
             result_msg = f"Импортировано: {imported_cameras} камер, {imported_markers} маркеров"
             if projector_created:
@@ -649,10 +653,11 @@ class ARUCO_OT_complete_import(Operator):
                 else:
                     color = (1.0, 1.0, 1.0, 1.0)  # Белый
                 
-                # Создание Empty объекта
-                bpy.ops.object.empty_add(type='PLAIN_AXES', location=tuple(position))
-                marker_obj = bpy.context.active_object
-                marker_obj.name = f"ArUco_Marker_{marker_id:02d}"
+                # Создание Empty объекта через bpy.data: без вызова оператора
+                # (и обновления сцены) на каждый маркер
+                marker_obj = bpy.data.objects.new(f"ArUco_Marker_{marker_id:02d}", None)
+                marker_obj.empty_display_type = 'PLAIN_AXES'
+                marker_obj.location = tuple(position)
                 marker_obj.empty_display_size = size
                 marker_obj.color = color
                 
@@ -662,10 +667,8 @@ class ARUCO_OT_complete_import(Operator):
                 marker_obj["quality"] = quality
                 marker_obj["triangulated_position"] = position
                 
-                # Перемещение в коллекцию
+                # Добавление в коллекцию
                 markers_collection.objects.link(marker_obj)
-                if marker_obj.name in bpy.context.scene.collection.objects:
-                    bpy.context.scene.collection.objects.unlink(marker_obj)
                 
                 imported_count += 1
                 
@@ -736,9 +739,8 @@ class ARUCO_OT_complete_import(Operator):
                 
             else:  # EMPTY
                 # Создаем Empty объект
-                bpy.ops.object.empty_add(type='SINGLE_ARROW', location=tuple(position))
-                proj_obj = bpy.context.active_object
-                proj_obj.name = "ArUco_Projector"
+                proj_obj = bpy.data.objects.new("ArUco_Projector", None)
+                proj_obj.empty_display_type = 'SINGLE_ARROW'
                 proj_obj.empty_display_size = props.projector_size
                 proj_obj.color = (1.0, 0.0, 1.0, 1.0)  # Магента для проектора
             
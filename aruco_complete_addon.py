@@ -215,6 +215,7 @@ class EmbeddedArUcoDetector:
         if not OPENCV_AVAILABLE:
             self.aruco_dict = None
             self.parameters = None
+            self.detector = None
             return
         
         self.dictionary = cv2.aruco.DICT_4X4_1000
@@ -227,6 +228,9 @@ class EmbeddedArUcoDetector:
         self.parameters.polygonalApproxAccuracyRate = 0.03
         self.parameters.minCornerDistanceRate = 0.05
         self.parameters.cornerRefinementMethod = cv2.aruco.CORNER_REFINE_SUBPIX
+        
+        # Детектор создается один раз и используется для всех изображений
+        self.detector = cv2.aruco.ArucoDetector(self.aruco_dict, self.parameters)
     
     def detect_markers_in_image(self, image_path):
         if not OPENCV_AVAILABLE:
@@ -238,8 +242,7 @@ class EmbeddedArUcoDetector:
                 return {}
             
             gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-            detector = cv2.aruco.ArucoDetector(self.aruco_dict, self.parameters)
-            corners, ids, _ = detector.detectMarkers(gray)
+            corners, ids, _ = self.detector.detectMarkers(gray)
             
             detections = {}
             
@@ -395,7 +398,7 @@ class EmbeddedTriangulator:
                     
                     point_3d = points_4d[:3] / points_4d[3]
                     
-                    if not np.any(np.isinf(point_3d)) and not np.any(np.isnan(point_3d)):
+                    if np.isfinite(point_3d).all():
                         triangulated_points.append(point_3d.flatten())
                         
                 except Exception:
@@ -674,21 +677,16 @@ class BlenderImporter:
                 else:
                     color = (1.0, 1.0, 1.0, 1.0)
                 
-                # Создание объекта
-                bpy.ops.object.empty_add(
-                    type=props.marker_type,
-                    location=tuple(result.position_3d)
-                )
-                
-                marker_obj = bpy.context.active_object
-                marker_obj.name = f"ArUco_{marker_id:02d}"
+                # Создание объекта через bpy.data: без вызова оператора
+                # (и обновления сцены) на каждый маркер
+                marker_obj = bpy.data.objects.new(f"ArUco_{marker_id:02d}", None)
+                marker_obj.empty_display_type = props.marker_type
+                marker_obj.location = tuple(result.position_3d)
                 marker_obj.empty_display_size = size
                 marker_obj.color = color
                 
-                # Перемещение в коллекцию
+                # Добавление в коллекцию
                 markers_collection.objects.link(marker_obj)
-                if marker_obj.name in bpy.context.scene.collection.objects:
-                    bpy.context.scene.collection.objects.unlink(marker_obj)
                 
                 # Сохранение данных
                 marker_obj["ArUco_Marker"] = True
@@ -897,6 +895,9 @@ class ARUCO_OT_oneclick_process(Operator):
             bpy.context.scene.unit_settings.system = 'METRIC'
             bpy.context.scene.unit_settings.scale_length = 1.0
             
+            # Обновление сцены один раз после импорта камер и маркеров
+            context.view_layer.update()
+            
             # Результат
             message = (f"✅ Готово! Время: {results['execution_time']:.1f}с, "
                       f"Камер: {imported_cameras}, Маркеров: {imported_markers} "
@@ -17,14 +17,26 @@ import cv2
 import os
 import glob
 import json
+import shutil
 import numpy as np
 from typing import Dict, List, Tuple, Optional, Set
 from dataclasses import dataclass
 
+# Быстрый JSON-сериализатор (необязательная зависимость)
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 
 # ЖЕСТКОЕ ОГРАНИЧЕНИЕ - ТОЛЬКО МАРКЕРЫ 1-13
 MAX_VALID_MARKER_ID = 13
 
+# Качество JPEG для изображений визуализации: кодирование заметно быстрее,
+# чем на значении OpenCV по умолчанию (95), разница на глаз не видна
+VISUALIZATION_JPEG_QUALITY = 85
+
 
 @dataclass
 class MarkerDetection:
@@ -43,7 +55,11 @@ class SimpleArUcoDetector:
     def __init__(self, enable_logging: bool = True, 
                  filter_6x6: bool = True,
                  min_marker_perimeter_rate: float = 0.03,
-                 max_marker_perimeter_rate: float = 4.0):
+                 max_marker_perimeter_rate: float = 4.0,
+                 detection_scale: float = 1.0,
+                 aruco3: bool = False,
+                 tau_c: int = 16,
+                 tau_i: float = 0.008):
         """
         Инициализация детектора
         
@@ -57,9 +73,25 @@ class SimpleArUcoDetector:
             Минимальный периметр маркера относительно размера изображения
         max_marker_perimeter_rate : float
             Максимальный периметр маркера относительно размера изображения
+        detection_scale : float
+            Масштаб изображения для поиска кандидатов (0 < scale <= 1).
+            При scale < 1 маркеры ищутся на уменьшенной копии, а углы
+            уточняются на изображении в полном разрешении
+        aruco3 : bool
+            Использовать алгоритм поиска ArUco3 (быстрее на больших кадрах)
+        tau_c : int
+            ArUco3: минимальная сторона маркера в канонических пикселях
+            (minSideLengthCanonicalImg)
+        tau_i : float
+            ArUco3: минимальная длина стороны маркера относительно
+            изображения (minMarkerLengthRatioOriginalImg)
         """
+        if not 0.0 < detection_scale <= 1.0:
+            raise ValueError(f"detection_scale должен быть в (0, 1], получено {detection_scale}")
+        
         self.enable_logging = enable_logging
         self.filter_6x6 = filter_6x6
+        self.detection_scale = detection_scale
         
         # Используем DICT_4X4_1000 для целевых маркеров
         self.dictionary_4x4 = cv2.aruco.DICT_4X4_1000
@@ -100,6 +132,19 @@ class SimpleArUcoDetector:
         self.parameters.cornerRefinementMaxIterations = 30
         self.parameters.cornerRefinementMinAccuracy = 0.1
         
+        # ArUco3: поиск кандидатов на уменьшенном изображении
+        if aruco3:
+            self.parameters.useAruco3Detection = True
+            self.parameters.minSideLengthCanonicalImg = tau_c
+            self.parameters.minMarkerLengthRatioOriginalImg = tau_i
+        
+        # Детекторы создаются один раз и используются для всех изображений.
+        # ArucoDetector копирует параметры, поэтому self.parameters
+        # настраивается до этой точки
+        self.detector_4x4 = cv2.aruco.ArucoDetector(self.aruco_dict_4x4, self.parameters)
+        if self.filter_6x6:
+            self.detector_6x6 = cv2.aruco.ArucoDetector(self.aruco_dict_6x6, self.parameters)
+        
         # Статистика
         self.detection_stats = {
             'total_images': 0,
@@ -118,6 +163,55 @@ class SimpleArUcoDetector:
             if self.filter_6x6:
                 print(f"   Фильтрация 6x6: ВКЛЮЧЕНА (DICT_6X6_250)")
             print(f"   Строгие параметры детекции: ВКЛЮЧЕНЫ")
+            if self.detection_scale < 1.0:
+                print(f"   Масштаб детекции: {self.detection_scale} (уточнение углов в полном разрешении)")
+            if aruco3:
+                print(f"   ArUco3: ВКЛЮЧЕН (tau_c={tau_c}, tau_i={tau_i})")
+    
+    def _detect_scaled(self, detector, gray_image: np.ndarray, refine: bool = True):
+        """
+        Запуск детектора с учетом detection_scale
+        
+        При detection_scale < 1 пороговая обработка и поиск контуров идут
+        по уменьшенной копии (в scale² раз меньше пикселей), найденные углы
+        переводятся в координаты исходного изображения и уточняются
+        cv2.cornerSubPix в полном разрешении.
+        
+        Parameters:
+        -----------
+        detector : cv2.aruco.ArucoDetector
+            Детектор с нужным словарем
+        gray_image : np.ndarray
+            Изображение в градациях серого в полном разрешении
+        refine : bool
+            Уточнять углы в полном разрешении
+            
+        Returns:
+        --------
+        tuple
+            (corners, ids) в координатах исходного изображения
+        """
+        scale = self.detection_scale
+        if scale >= 1.0:
+            corners, ids, _ = detector.detectMarkers(gray_image)
+            return corners, ids
+        
+        small = cv2.resize(gray_image, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+        corners, ids, _ = detector.detectMarkers(small)
+        if ids is None or len(ids) == 0:
+            return corners, ids
+        
+        # Перевод центров пикселей уменьшенной копии в исходные координаты
+        full = ((np.concatenate(corners).reshape(-1, 1, 2) + 0.5) / scale - 0.5).astype(np.float32)
+        
+        if refine:
+            win = self.parameters.cornerRefinementWinSize
+            criteria = (cv2.TERM_CRITERIA_EPS + cv2.TERM_CRITERIA_MAX_ITER,
+                        self.parameters.cornerRefinementMaxIterations,
+                        self.parameters.cornerRefinementMinAccuracy)
+            cv2.cornerSubPix(gray_image, full, (win, win), (-1, -1), criteria)
+        
+        return tuple(full.reshape(-1, 1, 4, 2)), ids
     
     def _detect_6x6_markers(self, gray_image: np.ndarray) -> Set[Tuple[int, int]]:
         """
@@ -137,14 +231,12 @@ class SimpleArUcoDetector:
             return set()
         
         try:
-            # Создаем детектор для 6x6
-            detector_6x6 = cv2.aruco.ArucoDetector(self.aruco_dict_6x6, self.parameters)
-            corners_6x6, ids_6x6, _ = detector_6x6.detectMarkers(gray_image)
+            corners_6x6, ids_6x6 = self._detect_scaled(self.detector_6x6, gray_image, refine=False)
             
             excluded_regions = set()
             
             if ids_6x6 is not None and len(ids_6x6) > 0:
-                for i, marker_id in enumerate(ids_6x6.flatten()):
+                for i, marker_id in enumerate(ids_6x6.ravel()):
                     # Получаем центр 6x6 маркера
                     marker_corners = corners_6x6[i].reshape(4, 2)
                     center_x = int(np.mean(marker_corners[:, 0]))
@@ -213,19 +305,16 @@ class SimpleArUcoDetector:
         # Проверка соотношения сторон (должен быть близок к квадрату)
         corners_2d = corners.reshape(4, 2)
         
-        # Вычисляем длины сторон
-        side1 = np.linalg.norm(corners_2d[1] - corners_2d[0])
-        side2 = np.linalg.norm(corners_2d[2] - corners_2d[1])
-        side3 = np.linalg.norm(corners_2d[3] - corners_2d[2])
-        side4 = np.linalg.norm(corners_2d[0] - corners_2d[3])
+        # Вычисляем длины всех четырех сторон одной операцией
+        edges = corners_2d - np.roll(corners_2d, -1, axis=0)
+        sides = np.sqrt((edges * edges).sum(axis=1))
         
         # Средняя длина стороны
-        avg_side = (side1 + side2 + side3 + side4) / 4
+        avg_side = sides.mean()
         
         # Проверка что все стороны примерно равны (допуск 30%)
-        for side in [side1, side2, side3, side4]:
-            if abs(side - avg_side) / avg_side > 0.3:
-                return False
+        if np.any(np.abs(sides - avg_side) > 0.3 * avg_side):
+            return False
         
         # Проверка площади (не слишком маленький)
         area = cv2.contourArea(corners_2d)
@@ -238,6 +327,30 @@ class SimpleArUcoDetector:
         
         return True
     
+    @staticmethod
+    def _read_grayscale(image_path: str) -> Optional[np.ndarray]:
+        """
+        Чтение изображения сразу в градациях серого
+
+        Файл читается одним буфером через np.fromfile и декодируется
+        cv2.imdecode без цветных каналов: JPEG-декодер выдает в 3 раза
+        меньше данных, а путь с кириллицей читается и под Windows.
+
+        Parameters:
+        -----------
+        image_path : str
+            Путь к изображению
+
+        Returns:
+        --------
+        np.ndarray or None
+            Изображение в градациях серого или None если файл не прочитан
+        """
+        raw = np.fromfile(image_path, dtype=np.uint8)
+        if raw.size == 0:
+            return None
+        return cv2.imdecode(raw, cv2.IMREAD_GRAYSCALE)
+
     def detect_markers_in_image(self, image_path: str) -> Dict[int, MarkerDetection]:
         """
         Детекция 4x4 маркеров с ID от 1 до 13
@@ -253,35 +366,28 @@ class SimpleArUcoDetector:
             Словарь детектированных 4x4 маркеров {marker_id: MarkerDetection}
         """
         try:
-            # Загрузка изображения
-            img = cv2.imread(image_path)
-            if img is None:
+            # Загрузка изображения сразу в градациях серого
+            gray = self._read_grayscale(image_path)
+            if gray is None:
                 if self.enable_logging:
                     print(f"[!] Не удалось прочитать {image_path}")
                 self.detection_stats['failed_images'].append(image_path)
                 return {}
-            
-            # Конвертация в серый
-            gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-            
+
             # Сначала находим 6x6 маркеры для исключения
             excluded_regions = self._detect_6x6_markers(gray)
             
             # Теперь ищем 4x4 маркеры
-            detector_4x4 = cv2.aruco.ArucoDetector(self.aruco_dict_4x4, self.parameters)
-            corners_4x4, ids_4x4, _ = detector_4x4.detectMarkers(gray)
+            corners_4x4, ids_4x4 = self._detect_scaled(self.detector_4x4, gray)
             
             # КРИТИЧЕСКАЯ ФИЛЬТРАЦИЯ: сразу отбрасываем все ID > 13
             if ids_4x4 is not None and len(ids_4x4) > 0:
-                valid_indices = []
-                for i, marker_id in enumerate(ids_4x4.flatten()):
-                    if marker_id <= MAX_VALID_MARKER_ID:
-                        valid_indices.append(i)
+                valid_mask = ids_4x4.ravel() <= MAX_VALID_MARKER_ID
                 
                 # Оставляем только валидные маркеры
-                if valid_indices:
-                    ids_4x4 = np.array([ids_4x4[i] for i in valid_indices])
-                    corners_4x4 = [corners_4x4[i] for i in valid_indices]
+                if valid_mask.any():
+                    ids_4x4 = ids_4x4[valid_mask]
+                    corners_4x4 = [c for c, keep in zip(corners_4x4, valid_mask) if keep]
                 else:
                     ids_4x4 = None
                     corners_4x4 = []
@@ -290,23 +396,20 @@ class SimpleArUcoDetector:
             detections = {}
             
             if ids_4x4 is not None and len(ids_4x4) > 0:
-                for i, marker_id in enumerate(ids_4x4.flatten()):
-                    marker_id_int = int(marker_id)
-                    
-                    # Извлечение углов маркера
-                    marker_corners = corners_4x4[i].reshape(4, 2)
-                    
-                    # Вычисление центра
-                    center_x = float(np.mean(marker_corners[:, 0]))
-                    center_y = float(np.mean(marker_corners[:, 1]))
-                    center = (center_x, center_y)
+                # Углы всех маркеров одним массивом (N, 4, 2), центры - одной операцией
+                all_corners = np.concatenate(corners_4x4, axis=0).reshape(-1, 4, 2)
+                centers = all_corners.mean(axis=1).tolist()
+                
+                for marker_id_int, marker_corners, center in zip(ids_4x4.ravel().tolist(),
+                                                                 all_corners, centers):
+                    center = tuple(center)
                     
                     # Проверка, не находится ли маркер в области 6x6
                     if self._is_in_excluded_region(center, excluded_regions):
                         continue
                     
                     # Дополнительная валидация 4x4 маркера
-                    if not self._validate_4x4_marker(corners_4x4[i], marker_id_int):
+                    if not self._validate_4x4_marker(marker_corners, marker_id_int):
                         continue
                     
                     # Вычисление площади
@@ -510,9 +613,13 @@ class SimpleArUcoDetector:
                     'area': detection.area
                 }
         
-        # Сохранение
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(json_data, f, indent=2, ensure_ascii=False)
+        # Сохранение (orjson пишет UTF-8 байты напрямую, без перекодирования)
+        if ORJSON_AVAILABLE:
+            with open(output_path, 'wb') as f:
+                f.write(orjson.dumps(json_data, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY))
+        else:
+            with open(output_path, 'w', encoding='utf-8') as f:
+                json.dump(json_data, f, indent=2, ensure_ascii=False)
         
         if self.enable_logging:
             print(f"Результаты сохранены в {output_path}")
@@ -559,14 +666,15 @@ class SimpleArUcoDetector:
                 continue
 
             gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+            drawn = False
 
             # Детекция 6x6 маркеров (для визуализации)
             if self.filter_6x6:
-                detector_6x6 = cv2.aruco.ArucoDetector(self.aruco_dict_6x6, self.parameters)
-                corners_6x6, ids_6x6, _ = detector_6x6.detectMarkers(gray)
+                corners_6x6, ids_6x6, _ = self.detector_6x6.detectMarkers(gray)
                 
                 # Отрисовка 6x6 красным цветом
                 if ids_6x6 is not None:
+                    drawn = True
                     for i in range(len(ids_6x6)):
                         cv2.drawContours(img, [corners_6x6[i].astype(int)], -1, (0, 0, 255), 2)
                         # Подпись ID
@@ -576,28 +684,32 @@ class SimpleArUcoDetector:
                                   cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 0, 255), 2)
 
             # Детекция 4x4 маркеров
-            detector_4x4 = cv2.aruco.ArucoDetector(self.aruco_dict_4x4, self.parameters)
-            corners_4x4, ids_4x4, _ = detector_4x4.detectMarkers(gray)
+            corners_4x4, ids_4x4, _ = self.detector_4x4.detectMarkers(gray)
 
             # ФИЛЬТРУЕМ И РИСУЕМ ТОЛЬКО МАРКЕРЫ С ID 1-13
             if ids_4x4 is not None:
                 valid_corners = []
                 valid_ids = []
                 
-                for i, marker_id in enumerate(ids_4x4.flatten()):
+                for i, marker_id in enumerate(ids_4x4.ravel()):
                     if marker_id <= MAX_VALID_MARKER_ID:
                         valid_corners.append(corners_4x4[i])
                         valid_ids.append([marker_id])
                 
                 # Отрисовка только валидных 4x4 зеленым цветом
                 if valid_corners:
+                    drawn = True
                     cv2.aruco.drawDetectedMarkers(img, valid_corners, 
                                                  np.array(valid_ids), 
                                                  borderColor=(0, 255, 0))
 
-            # Сохраняем результат
+            # Сохраняем результат: без отрисовки файл копируется как есть,
+            # без повторного кодирования
             out_path = os.path.join(output_dir, os.path.basename(img_path))
-            cv2.imwrite(out_path, img)
+            if drawn:
+                cv2.imwrite(out_path, img, [cv2.IMWRITE_JPEG_QUALITY, VISUALIZATION_JPEG_QUALITY])
+            else:
+                shutil.copyfile(img_path, out_path)
         
         if self.enable_logging:
             print(f" Изображения с маркерами сохранены в {output_dir}")
@@ -605,6 +717,39 @@ class SimpleArUcoDetector:
             print(f"    Красные рамки - маркеры 6x6 (отфильтрованные)")
 
 
+# Параллельная детекция: функции для процессов-воркеров
+
+# Детектор процесса-воркера, создается один раз в init_detection_worker
+_worker_detector = None
+
+
+def init_detection_worker(filter_6x6: bool = True) -> None:
+    """
+    Инициализатор процесса-воркера (initializer для ProcessPoolExecutor)
+    
+    Детектор и объекты OpenCV создаются внутри воркера и не передаются
+    между процессами. Внутренний пул потоков OpenCV отключается:
+    параллелизм уже дают процессы, и N воркеров с N потоками каждый
+    только конкурировали бы за ядра.
+    """
+    global _worker_detector
+    cv2.setNumThreads(1)
+    _worker_detector = SimpleArUcoDetector(enable_logging=False, filter_6x6=filter_6x6)
+
+
+def detect_image_in_worker(image_path: str) -> Tuple[str, Dict[int, MarkerDetection]]:
+    """
+    Детекция маркеров на одном изображении в процессе-воркере
+    
+    Returns:
+    --------
+    tuple
+        (camera_id, {marker_id: MarkerDetection}), camera_id - имя файла без расширения
+    """
+    camera_id = os.path.splitext(os.path.basename(image_path))[0]
+    return camera_id, _worker_detector.detect_markers_in_image(image_path)
+
+
 # Удобные функции для совместимости
 
 def detect_markers_simple(image_path: str) -> Dict[int, Tuple[float, float]]:
@@ -634,7 +779,9 @@ def detect_markers_simple(image_path: str) -> Dict[int, Tuple[float, float]]:
 def detect_all_markers_in_directory(directory: str = "data", 
                                    output_file: str = "detection_results.json",
                                    create_images: bool = False,
-                                   images_output_dir: str = "output") -> Dict:
+                                   images_output_dir: str = "output",
+                                   detection_scale: float = 1.0,
+                                   aruco3: bool = False) -> Dict:
     """
     Основная функция для детекции маркеров в директории
     
@@ -648,6 +795,10 @@ def detect_all_markers_in_directory(directory: str = "data",
         Создавать ли изображения с отмеченными маркерами
     images_output_dir : str
         Директория для сохранения изображений с маркерами
+    detection_scale : float
+        Масштаб изображения для поиска маркеров (1.0 - полное разрешение)
+    aruco3 : bool
+        Использовать алгоритм поиска ArUco3
         
     Returns:
     --------
@@ -665,7 +816,8 @@ def detect_all_markers_in_directory(directory: str = "data",
     print("=" * 50)
     
     # Создание детектора с жесткой фильтрацией
-    detector = SimpleArUcoDetector(enable_logging=True, filter_6x6=True)
+    detector = SimpleArUcoDetector(enable_logging=True, filter_6x6=True,
+                                   detection_scale=detection_scale, aruco3=aruco3)
     
     # Детекция
     detections = detector.detect_markers_in_directory(directory)
@@ -720,6 +872,19 @@ def main():
         help='Отключить фильтрацию 6x6 маркеров'
     )
     
+    parser.add_argument(
+        '--detection_scale',
+        type=float,
+        default=1.0,
+        help='Масштаб изображения для поиска маркеров, углы уточняются в полном разрешении (по умолчанию: 1.0)'
+    )
+    
+    parser.add_argument(
+        '--aruco3',
+        action='store_true',
+        help='Использовать быстрый алгоритм поиска ArUco3'
+    )
+    
     args = parser.parse_args()
     
     # Проверка входной директории
@@ -734,7 +899,9 @@ def main():
     # Создание детектора
     detector = SimpleArUcoDetector(
         enable_logging=True, 
-        filter_6x6=not args.no_filter_6x6
+        filter_6x6=not args.no_filter_6x6,
+        detection_scale=args.detection_scale,
+        aruco3=args.aruco3
     )
     
     # Запуск детекции
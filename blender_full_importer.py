@@ -136,14 +136,11 @@ def create_marker(marker_id, marker_data, collection, settings):
     confidence = marker_data['confidence']
     quality = marker_data.get('quality', 'unknown')
     
-    # Создание Empty объекта
-    bpy.ops.object.empty_add(
-        type=settings['empty_type'],
-        location=tuple(position)
-    )
-    
-    marker_obj = bpy.context.active_object
-    marker_obj.name = name
+    # Создание Empty объекта через bpy.data: без вызова оператора
+    # (и обновления сцены) на каждый маркер
+    marker_obj = bpy.data.objects.new(name, None)
+    marker_obj.empty_display_type = settings['empty_type']
+    marker_obj.location = tuple(position)
     
     # Размер в зависимости от качества
     if settings['size_by_quality']:
@@ -173,13 +170,9 @@ def create_marker(marker_id, marker_data, collection, settings):
     marker_obj["quality"] = quality
     marker_obj["triangulated_position"] = position
     
-    # Перемещение в коллекцию
+    # Добавление в коллекцию
     collection.objects.link(marker_obj)
     
-    # Убираем из Scene Collection
-    if marker_obj.name in bpy.context.scene.collection.objects:
-        bpy.context.scene.collection.objects.unlink(marker_obj)
-    
     return marker_obj
 
 def import_cameras(folder):
@@ -319,6 +312,9 @@ def main():
         # Импорт маркеров
         imported_markers = import_markers(MARKERS_FILE)
         
+        # Один пересчет сцены после создания всех объектов
+        bpy.context.view_layer.update()
+        
         # Итоговая статистика
         print("\nИМПОРТ ЗАВЕРШЕН УСПЕШНО!")
         print(f"   Импортировано камер: {len(imported_cameras)}")
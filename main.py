@@ -21,65 +21,201 @@ import os
 import sys
 import json
 import time
+import pickle
+import hashlib
+import operator
+import numpy as np
+from collections import Counter
+from itertools import chain
+from concurrent.futures import ProcessPoolExecutor
 
-# Импорт наших модулей
+# Быстрый JSON-сериализатор (необязательная зависимость)
 try:
-    from xmp_parser import SimpleXMPParser
-    from xmp_to_opencv import convert_cameras_to_opencv
-    from aruco_detector import SimpleArUcoDetector
-    from triangulation import triangulate_markers
-    from config import CURRENT_IMAGE_SIZE
-except ImportError as e:
-    print(f"Ошибка импорта модулей: {e}")
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# Пороги уверенности триангуляции для оценки качества маркеров
+HIGH_CONFIDENCE_THRESHOLD = 0.7
+MEDIUM_CONFIDENCE_THRESHOLD = 0.5
+QUALITY_LABELS = ('low', 'medium', 'high')
+
+# Поля MarkerTriangulation для экспорта, выбираются одним вызовом
+_MARKER_FIELDS = operator.attrgetter(
+    'position_3d', 'triangulation_confidence', 'reprojection_error',
+    'observations_count', 'camera_ids'
+)
+
+# Точность координат маркеров в JSON: 6 знаков - микрометры, что намного
+# точнее триангуляции, а файл заметно короче
+POSITION_DECIMALS = 6
+
+# Кэш разобранных XMP файлов между запусками
+XMP_CACHE_DIR = '.cache'
+
+# Подробный вывод (ход триангуляции по маркерам, справка по JSON);
+# ARUCO_VERBOSE=0 оставляет только итоги этапов
+VERBOSE = os.environ.get('ARUCO_VERBOSE', '1') == '1'
+
+# Поддерживаемые форматы изображений
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp')
+
+# XMP файлы меньше этого размера не могут содержать параметры камеры
+# (пустые или обрезанные) и отбрасываются до разбора
+MIN_XMP_SIZE = 128
+
+# Описание структуры aruco_marker.json, выводится в конце пайплайна
+JSON_STRUCTURE_HELP = """
+Содержимое JSON:
+   • metadata - информация о триангуляции
+   • markers - 3D позиции маркеров с метаданными
+
+Структура маркера:
+   • id - номер маркера (1-13)
+   • position - [X, Y, Z] координаты в метрах
+   • confidence - уверенность триангуляции (0-1)
+   • quality - 'high'/'medium'/'low'
+   • reprojection_error - ошибка в пикселях
+   • observations_count - количество камер
+   • camera_ids - список ID камер
+
+"""
+
+
+def _quality_levels(confidences: np.ndarray) -> np.ndarray:
+    """Уровни качества 0/1/2 (индексы в QUALITY_LABELS) для массива уверенностей"""
+    return np.digitize(confidences, (MEDIUM_CONFIDENCE_THRESHOLD, HIGH_CONFIDENCE_THRESHOLD))
+
+
+def _quality_labels(triangulated_markers) -> list:
+    """Категории качества маркеров в порядке обхода словаря"""
+    confidences = np.fromiter(
+        (m.triangulation_confidence for m in triangulated_markers.values()),
+        dtype=np.float64, count=len(triangulated_markers)
+    )
+    return [QUALITY_LABELS[level] for level in _quality_levels(confidences)]
+
+
+def _exit_on_import_error(error: ImportError):
+    """Сообщение о недостающем модуле проекта и завершение работы"""
+    print(f"Ошибка импорта модулей: {error}")
     print("Убедитесь, что все файлы проекта находятся в одной директории:")
     print("  - xmp_parser.py, xmp_to_opencv.py, aruco_detector.py")
     print("  - triangulation.py, config.py")
     sys.exit(1)
 
 
-def validate_input_data(data_dir: str) -> bool:
-    """Валидация входных данных"""
+def _marker_summary(triangulated_markers) -> tuple:
+    """
+    Сводная статистика по триангулированным маркерам
+    
+    Поля маркеров выбираются в массив за один проход, все редукции
+    выполняются в NumPy.
+    
+    Returns:
+    --------
+    tuple
+        (high, medium, low, avg_error) - число маркеров по уровням качества
+        и средняя ошибка репроекции в пикселях
+    """
+    stats = np.fromiter(
+        ((m.triangulation_confidence, m.reprojection_error) for m in triangulated_markers.values()),
+        dtype=[('confidence', np.float64), ('error', np.float64)],
+        count=len(triangulated_markers)
+    )
+    low, medium, high = np.bincount(_quality_levels(stats['confidence']), minlength=3).tolist()
+    avg_error = float(stats['error'].mean()) if len(stats) else 0.0
+    return high, medium, low, avg_error
+
+
+def validate_input_data(data_dir: str):
+    """
+    Валидация входных данных
+    
+    Returns:
+    --------
+    tuple or None
+        (xmp_paths, image_paths) - отсортированные пути к файлам,
+        None если данные не прошли проверку
+    """
     if not os.path.exists(data_dir):
         print(f"Директория не найдена: {data_dir}")
-        return False
-    
-    # Поиск XMP файлов
-    xmp_files = [f for f in os.listdir(data_dir) if f.endswith('.xmp')]
-    if not xmp_files:
+        return None
+    
+    # Один проход по директории: XMP файлы и изображения
+    xmp_ids, image_ids = set(), set()
+    xmp_paths, image_paths = [], []
+    with os.scandir(data_dir) as entries:
+        for entry in entries:
+            if not entry.is_file():
+                continue
+            stem, _, ext = entry.name.rpartition('.')
+            if not stem:
+                continue
+            ext = '.' + ext.lower()
+            if ext == '.xmp':
+                if entry.stat().st_size < MIN_XMP_SIZE:
+                    continue
+                xmp_ids.add(stem)
+                xmp_paths.append(entry.path)
+            elif ext in IMAGE_EXTENSIONS:
+                image_ids.add(stem)
+                image_paths.append(entry.path)
+    
+    if not xmp_paths:
         print(f"XMP файлы не найдены в {data_dir}")
-        return False
-    
-    # Поиск изображений
-    image_extensions = ['.jpg', '.jpeg', '.png', '.bmp']
-    image_files = []
-    for f in os.listdir(data_dir):
-        if any(f.lower().endswith(ext) for ext in image_extensions):
-            image_files.append(f)
+        return None
     
-    if not image_files:
+    if not image_paths:
         print(f"Изображения не найдены в {data_dir}")
-        return False
+        return None
     
     # Проверка соответствия
-    xmp_ids = {os.path.splitext(f)[0] for f in xmp_files}
-    image_ids = {os.path.splitext(f)[0] for f in image_files}
     common_ids = xmp_ids & image_ids
     
     if len(common_ids) < 3:
         print(f"Недостаточно пар XMP-изображение: {len(common_ids)} < 3")
-        return False
+        return None
     
-    print(f"Найдено {len(xmp_files)} XMP файлов и {len(image_files)} изображений")
+    print(f"Найдено {len(xmp_paths)} XMP файлов и {len(image_paths)} изображений")
     print(f"   Совпадающих пар: {len(common_ids)}")
-    return True
+    
+    # Списки файлов передаются дальше, чтобы этапы не сканировали директорию повторно
+    xmp_paths.sort()
+    image_paths.sort()
+    return xmp_paths, image_paths
 
 
-def load_cameras(data_dir: str):
+def load_cameras(data_dir: str, xmp_paths=None):
     """Этап 1: Загрузка параметров камер из XMP файлов"""
     print("\nЭтап 1: Загрузка параметров камер")
     
-    parser = SimpleXMPParser(enable_logging=False)
-    xmp_cameras = parser.load_all_cameras(data_dir)
+    # Модули этапов импортируются по мере надобности: OpenCV не грузится,
+    # если проверка входных данных не прошла
+    try:
+        from xmp_parser import SimpleXMPParser
+    except ImportError as e:
+        _exit_on_import_error(e)
+    
+    if xmp_paths is None and os.path.isdir(data_dir):
+        xmp_paths = sorted(
+            os.path.join(data_dir, f) for f in os.listdir(data_dir)
+            if f.lower().endswith('.xmp')
+        )
+    
+    # Повторные запуски на тех же XMP файлах берут результат из кэша
+    cache_file = _xmp_cache_file(data_dir) if xmp_paths else None
+    cache_key = _xmp_cache_key(xmp_paths) if xmp_paths else None
+    xmp_cameras = _read_xmp_cache(cache_file, cache_key) if cache_file else None
+    
+    if xmp_cameras is None:
+        parser = SimpleXMPParser(enable_logging=False)
+        xmp_cameras = parser.load_all_cameras(data_dir, xmp_paths)
+        if xmp_cameras and cache_file:
+            _write_xmp_cache(cache_file, cache_key, xmp_cameras)
+    else:
+        print(f"   Камеры загружены из кэша")
     
     if not xmp_cameras:
         raise ValueError("Не удалось загрузить камеры")
@@ -88,10 +224,72 @@ def load_cameras(data_dir: str):
     return xmp_cameras
 
 
+def _xmp_cache_file(data_dir: str) -> str:
+    """
+    Путь к файлу кэша XMP
+    
+    Один файл на директорию данных: при изменении XMP файлов он
+    перезаписывается, и старые кэши не накапливаются.
+    """
+    name = hashlib.blake2b(os.path.abspath(data_dir).encode('utf-8'), digest_size=16).hexdigest()
+    return os.path.join(XMP_CACHE_DIR, f"xmp_{name}.pkl")
+
+
+def _xmp_cache_key(xmp_paths) -> str:
+    """
+    Ключ актуальности кэша для набора XMP файлов
+    
+    Ключ строится по пути, времени изменения и размеру каждого файла,
+    а также по xmp_parser.py, чтобы изменение парсера сбрасывало кэш.
+    """
+    import xmp_parser
+    
+    key_parts = []
+    for path in sorted(xmp_paths) + [xmp_parser.__file__]:
+        stat = os.stat(path)
+        key_parts.append(f"{os.path.abspath(path)}:{stat.st_mtime_ns}:{stat.st_size}")
+    
+    return hashlib.blake2b("|".join(key_parts).encode('utf-8'), digest_size=16).hexdigest()
+
+
+def _read_xmp_cache(cache_file: str, cache_key: str):
+    """Чтение кэша XMP, None если кэша нет, он устарел или поврежден"""
+    try:
+        with open(cache_file, 'rb') as f:
+            # Ключ записан первым: устаревший кэш отбрасывается без чтения камер
+            if pickle.load(f) != cache_key:
+                return None
+            return pickle.load(f)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        print(f"   Кэш XMP не прочитан ({e}), файлы будут разобраны заново")
+        return None
+
+
+def _write_xmp_cache(cache_file: str, cache_key: str, xmp_cameras):
+    """Атомарная запись кэша XMP (ошибки записи не прерывают пайплайн)"""
+    try:
+        os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+        tmp_file = f"{cache_file}.{os.getpid()}.tmp"
+        with open(tmp_file, 'wb') as f:
+            pickle.dump(cache_key, f, protocol=5)
+            pickle.dump(xmp_cameras, f, protocol=5)
+        os.replace(tmp_file, cache_file)
+    except OSError as e:
+        print(f"   Не удалось сохранить кэш XMP: {e}")
+
+
 def convert_cameras(xmp_cameras):
     """Этап 2: Конвертация параметров камер в OpenCV формат"""
     print("Этап 2: Конвертация в OpenCV формат")
     
+    try:
+        from xmp_to_opencv import convert_cameras_to_opencv
+        from config import CURRENT_IMAGE_SIZE
+    except ImportError as e:
+        _exit_on_import_error(e)
+    
     opencv_cameras = convert_cameras_to_opencv(xmp_cameras, CURRENT_IMAGE_SIZE)
     
     if not opencv_cameras:
@@ -101,30 +299,71 @@ def convert_cameras(xmp_cameras):
     return opencv_cameras
 
 
-def detect_markers(data_dir: str):
-    """Этап 3: Детекция ArUco маркеров"""
+def load_and_convert_cameras(data_dir: str, xmp_paths=None):
+    """Этапы 1-2: Загрузка камер из XMP и конвертация в OpenCV формат"""
+    xmp_cameras = load_cameras(data_dir, xmp_paths)
+    return xmp_cameras, convert_cameras(xmp_cameras)
+
+
+def start_marker_detection(data_dir: str, image_paths=None):
+    """
+    Этап 3 (запуск): отправка изображений в пул процессов детекции
+    
+    Процессы пула создаются сразу, в вызывающем потоке. Вызывать до запуска
+    других потоков: fork многопоточного процесса может оставить дочерний
+    процесс с чужой захваченной блокировкой.
+    
+    Returns:
+    --------
+    tuple
+        (executor, results) - пул процессов (закрывается вызывающим кодом)
+        и итератор пар (camera_id, детекции)
+    """
+    # Импорт до запуска пула: воркеры получают уже загруженный модуль
+    try:
+        import aruco_detector
+    except ImportError as e:
+        _exit_on_import_error(e)
+    
+    if image_paths is None:
+        image_paths = sorted(
+            os.path.join(data_dir, f) for f in os.listdir(data_dir)
+            if f.lower().endswith(IMAGE_EXTENSIONS)
+        )
+    
+    # Изображения независимы - распределяем их по процессам,
+    # примерно по 4 пачки на воркер. Процессов не больше, чем изображений
+    # (каждый создает свой детектор), и не больше 61 - предел
+    # ProcessPoolExecutor в Windows
+    workers = max(1, min(os.cpu_count() or 1, len(image_paths), 61))
+    chunksize = max(1, len(image_paths) // (4 * workers))
+    executor = ProcessPoolExecutor(max_workers=workers,
+                                   initializer=aruco_detector.init_detection_worker,
+                                   initargs=(True,))
+    # map отправляет все задачи сразу, при первой отправке запускаются все процессы
+    results = executor.map(
+        aruco_detector.detect_image_in_worker, image_paths, chunksize=chunksize
+    )
+    return executor, results
+
+
+def finish_marker_detection(results):
+    """Этап 3 (завершение): сбор результатов детекции ArUco маркеров"""
     print("Этап 3: Детекция ArUco маркеров (ID 1-13)")
     
-    detector = SimpleArUcoDetector(enable_logging=False, filter_6x6=True)
-    marker_detections = detector.detect_markers_in_directory(data_dir)
+    marker_detections = dict(results)
     
     if not marker_detections:
         raise ValueError("Маркеры не найдены")
     
     # Анализ результатов
-    total_detections = sum(len(detections) for detections in marker_detections.values())
-    unique_markers = set()
-    for detections in marker_detections.values():
-        unique_markers.update(detections.keys())
+    total_detections = sum(map(len, marker_detections.values()))
     
-    # Подсчет маркеров для триангуляции
-    marker_frequency = {}
-    for detections in marker_detections.values():
-        for marker_id in detections.keys():
-            marker_frequency[marker_id] = marker_frequency.get(marker_id, 0) + 1
+    # Подсчет маркеров для триангуляции (Counter считает на уровне C)
+    marker_frequency = Counter(chain.from_iterable(marker_detections.values()))
     
-    triangulatable_markers = sum(1 for freq in marker_frequency.values() if freq >= 3)
-    found_markers = sorted(list(unique_markers))
+    triangulatable_markers = sum(freq >= 3 for freq in marker_frequency.values())
+    found_markers = sorted(marker_frequency)
     
     print(f"   Найдено маркеров: {found_markers}")
     print(f"   Всего детекций: {total_detections}")
@@ -133,18 +372,35 @@ def detect_markers(data_dir: str):
     return marker_detections
 
 
+def detect_markers(data_dir: str, image_paths=None):
+    """Этап 3: Детекция ArUco маркеров"""
+    executor, results = start_marker_detection(data_dir, image_paths)
+    with executor:
+        return finish_marker_detection(results)
+
+
 def triangulate_all_markers(opencv_cameras, marker_detections):
-    """Этап 4: 3D триангуляция маркеров"""
+    """
+    Этап 4: 3D триангуляция маркеров
+    
+    Returns:
+    --------
+    tuple
+        (triangulated_markers, summary), summary - результат _marker_summary
+    """
     print("Этап 4: 3D триангуляция маркеров")
     
+    try:
+        from triangulation import triangulate_markers
+    except ImportError as e:
+        _exit_on_import_error(e)
+    
     # Отладочная информация
     print(f"   Камер с параметрами: {len(opencv_cameras)}")
     print(f"   Камер с детекциями: {len(marker_detections)}")
     
     # Проверим совместимость данных
-    camera_ids_opencv = set(opencv_cameras.keys())
-    camera_ids_detections = set(marker_detections.keys())
-    common_cameras = camera_ids_opencv & camera_ids_detections
+    common_cameras = opencv_cameras.keys() & marker_detections.keys()
     print(f"   Общих камер: {len(common_cameras)}")
     
     if len(common_cameras) == 0:
@@ -154,81 +410,164 @@ def triangulate_all_markers(opencv_cameras, marker_detections):
         opencv_cameras,
         marker_detections,
         min_cameras=3,
-        max_reprojection_error=200.0
+        max_reprojection_error=200.0,
+        # DLT по всем камерам с отбрасыванием выбросов по ошибке репроекции
+        solver='eigh',
+        enable_logging=VERBOSE
     )
     
     if not triangulated_markers:
         raise ValueError("Не удалось триангулировать маркеры")
     
-    # Анализ результатов
-    high_confidence = sum(1 for m in triangulated_markers.values() if m.triangulation_confidence >= 0.7)
-    avg_error = sum(m.reprojection_error for m in triangulated_markers.values()) / len(triangulated_markers)
-    triangulated_ids = sorted(list(triangulated_markers.keys()))
+    # Анализ результатов: статистика возвращается вместе с маркерами
+    summary = _marker_summary(triangulated_markers)
+    high_confidence, _, _, avg_error = summary
+    triangulated_ids = sorted(triangulated_markers)
     
     print(f"   Триангулировано маркеров: {triangulated_ids}")
     print(f"   Высокого качества: {high_confidence}/{len(triangulated_markers)}")
     print(f"   Средняя ошибка: {avg_error:.2f} пикс")
     
-    return triangulated_markers
+    return triangulated_markers, summary
 
 
-def create_blender_files(triangulated_markers, opencv_cameras, xmp_cameras, output_dir: str, data_dir: str):
+def create_blender_files(triangulated_markers, opencv_cameras, xmp_cameras, output_dir: str, data_dir: str,
+                         summary=None):
     """Этап 5: Создание aruco_marker.json"""
     print("Этап 5: Создание aruco_marker.json")
     
-    # Подготовка данных для маркеров
-    blender_data = prepare_blender_export(triangulated_markers)
+    metadata = _export_metadata(triangulated_markers, summary)
     
-    # Сохранение JSON файла
     json_file = os.path.join(output_dir, 'aruco_marker.json')
-    with open(json_file, 'w', encoding='utf-8') as f:
-        json.dump(blender_data, f, indent=2, ensure_ascii=False)
+    stamp_file = os.path.join(output_dir, '.aruco_marker.stamp')
+    content_hash = _export_hash(metadata, triangulated_markers)
+    
+    # Повторный запуск на тех же данных не перезаписывает файл
+    size_bytes = _unchanged_export_size(json_file, stamp_file, content_hash)
+    if size_bytes is not None:
+        print(f"   Данные не изменились, файл не перезаписан")
+    else:
+        size_bytes = _write_markers_json(json_file, metadata, triangulated_markers)
+        with open(stamp_file, 'w', encoding='utf-8') as f:
+            f.write(f"{content_hash} {size_bytes}")
     
     # Статистика
-    high_quality_markers = sum(1 for m in triangulated_markers.values() if m.triangulation_confidence >= 0.7)
+    high_quality_markers = metadata['high_confidence_markers']
     
     print(f"   JSON файл: {json_file}")
     print(f"   Маркеров высокого качества: {high_quality_markers}/{len(triangulated_markers)}")
-    print(f"   Размер файла: {os.path.getsize(json_file) // 1024:.1f} KB")
+    print(f"   Размер файла: {size_bytes // 1024:.1f} KB")
     
     return json_file
 
 
+def _write_markers_json(json_file: str, metadata: dict, triangulated_markers) -> int:
+    """
+    Потоковая запись aruco_marker.json, возвращает размер файла в байтах
+    
+    Маркеры сериализуются по одному, без промежуточного словаря со всеми
+    записями. Формат совпадает с json.dump(indent=2). Запись идет во
+    временный файл, который затем атомарно заменяет JSON - читатели
+    (аддоны Blender) никогда не видят файл записанным наполовину.
+    """
+    tmp_file = f"{json_file}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_file, 'wb') as f:
+            f.write(b'{\n  "metadata": ' + _dumps_indented(metadata, 1) + b',\n  "markers": {')
+            separator = b'\n'
+            qualities = _quality_labels(triangulated_markers)
+            for (marker_id, result), quality in zip(triangulated_markers.items(), qualities):
+                f.write(separator + f'    "marker_{marker_id}": '.encode('utf-8'))
+                f.write(_dumps_indented(_marker_record(marker_id, result, quality), 2))
+                separator = b',\n'
+            f.write(b'\n  }\n}' if triangulated_markers else b'}\n}')
+            size_bytes = f.tell()
+        os.replace(tmp_file, json_file)
+    except BaseException:
+        if os.path.exists(tmp_file):
+            os.remove(tmp_file)
+        raise
+    
+    return size_bytes
+
+
+def _export_hash(metadata: dict, triangulated_markers) -> str:
+    """Хэш содержимого экспорта: метаданные, поля маркеров в порядке записи и точность координат"""
+    content = (
+        metadata,
+        [(marker_id, _MARKER_FIELDS(result)) for marker_id, result in triangulated_markers.items()],
+        POSITION_DECIMALS
+    )
+    return hashlib.blake2b(pickle.dumps(content, protocol=5), digest_size=16).hexdigest()
+
+
+def _unchanged_export_size(json_file: str, stamp_file: str, content_hash: str):
+    """Размер ранее записанного JSON, если он соответствует хэшу, иначе None"""
+    try:
+        with open(stamp_file, 'r', encoding='utf-8') as f:
+            stamp_hash, _, stamp_size = f.read().partition(' ')
+        size_bytes = os.path.getsize(json_file)
+    except OSError:
+        return None
+    
+    # Размер защищает от ручного редактирования JSON после записи
+    if stamp_hash != content_hash or stamp_size != str(size_bytes):
+        return None
+    return size_bytes
+
+
+def _dumps_indented(obj, level: int) -> bytes:
+    """JSON объекта с отступом 2 пробела, вложенный на level уровней"""
+    if ORJSON_AVAILABLE:
+        # orjson сразу отдает UTF-8 байты и сам сериализует numpy массивы
+        data = orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY)
+    else:
+        data = json.dumps(obj, indent=2, ensure_ascii=False).encode('utf-8')
+    return data.replace(b'\n', b'\n' + b'  ' * level)
+
+
+def _export_metadata(triangulated_markers, summary=None) -> dict:
+    """Метаданные экспорта маркеров (summary - готовый результат _marker_summary)"""
+    if summary is None:
+        summary = _marker_summary(triangulated_markers)
+    high_confidence_count, medium_confidence_count, low_confidence_count, _ = summary
+    
+    return {
+        'total_markers': len(triangulated_markers),
+        'high_confidence_markers': high_confidence_count,
+        'medium_confidence_markers': medium_confidence_count,
+        'low_confidence_markers': low_confidence_count,
+        'coordinate_system': 'realitycapture_absolute',
+        'created_by': 'ArUco Autocalibration Pipeline',
+        'format_version': '1.0'
+    }
+
+
+def _marker_record(marker_id, result, quality: str) -> dict:
+    """Запись одного маркера для экспорта"""
+    position, confidence, error, observations, camera_ids = _MARKER_FIELDS(result)
+    
+    return {
+        'id': marker_id,
+        'position': [round(coordinate, POSITION_DECIMALS) for coordinate in position],
+        'confidence': confidence,
+        'quality': quality,
+        'reprojection_error': error,
+        'observations_count': observations,
+        'camera_ids': camera_ids
+    }
+
+
 def prepare_blender_export(triangulated_markers) -> dict:
     """Подготовка данных маркеров для экспорта в JSON"""
-    
-    # Подсчитываем маркеры высокого качества
-    high_confidence_count = sum(1 for m in triangulated_markers.values() if m.triangulation_confidence >= 0.7)
-    medium_confidence_count = sum(1 for m in triangulated_markers.values() if 0.5 <= m.triangulation_confidence < 0.7)
-    low_confidence_count = len(triangulated_markers) - high_confidence_count - medium_confidence_count
-    
-    blender_data = {
-        'metadata': {
-            'total_markers': len(triangulated_markers),
-            'high_confidence_markers': high_confidence_count,
-            'medium_confidence_markers': medium_confidence_count,
-            'low_confidence_markers': low_confidence_count,
-            'coordinate_system': 'realitycapture_absolute',
-            'created_by': 'ArUco Autocalibration Pipeline',
-            'format_version': '1.0'
-        },
-        'markers': {}
-    }
-    
-    for marker_id, result in triangulated_markers.items():
-        quality = 'high' if result.triangulation_confidence >= 0.7 else 'medium' if result.triangulation_confidence >= 0.5 else 'low'
-        
-        blender_data['markers'][f'marker_{marker_id}'] = {
-            'id': marker_id,
-            'position': list(result.position_3d),
-            'confidence': result.triangulation_confidence,
-            'quality': quality,
-            'reprojection_error': result.reprojection_error,
-            'observations_count': result.observations_count,
-            'camera_ids': result.camera_ids
+    qualities = _quality_labels(triangulated_markers)
+    return {
+        'metadata': _export_metadata(triangulated_markers),
+        'markers': {
+            f'marker_{marker_id}': _marker_record(marker_id, result, quality)
+            for (marker_id, result), quality in zip(triangulated_markers.items(), qualities)
         }
-    
-    return blender_data
+    }
 
 
 def main():
@@ -249,24 +588,31 @@ def main():
         start_time = time.time()
         
         # Валидация данных
-        if not validate_input_data(DATA_DIR):
+        input_files = validate_input_data(DATA_DIR)
+        if input_files is None:
             return 1
+        xmp_paths, image_paths = input_files
         
-        # Этап 1: Загрузка камер
-        xmp_cameras = load_cameras(DATA_DIR)
-        
-        # Этап 2: Конвертация камер
-        opencv_cameras = convert_cameras(xmp_cameras)
-        
-        # Этап 3: Детекция маркеров
-        marker_detections = detect_markers(DATA_DIR)
+        # Этапы 1-2 читают только XMP, этап 3 - только изображения.
+        # Процессы детекции запускаются первыми, пока в процессе один поток
+        # (fork многопоточного процесса может привести к взаимоблокировке),
+        # а этапы 1-2 выполняются в главном потоке параллельно с ними
+        executor, detection_results = start_marker_detection(DATA_DIR, image_paths)
+        with executor:
+            # Этап 1: Загрузка камер, Этап 2: Конвертация камер
+            xmp_cameras, opencv_cameras = load_and_convert_cameras(DATA_DIR, xmp_paths)
+            
+            # Этап 3: Детекция маркеров
+            marker_detections = finish_marker_detection(detection_results)
         
         # Этап 4: Триангуляция
-        triangulated_markers = triangulate_all_markers(opencv_cameras, marker_detections)
+        # (статистика качества считается один раз для JSON и итогового отчета)
+        triangulated_markers, summary = triangulate_all_markers(opencv_cameras, marker_detections)
         
         # Этап 5: Создание JSON файла
         json_file = create_blender_files(
-            triangulated_markers, opencv_cameras, xmp_cameras, OUTPUT_DIR, DATA_DIR
+            triangulated_markers, opencv_cameras, xmp_cameras, OUTPUT_DIR, DATA_DIR,
+            summary=summary
         )
         
         # Финальный результат
@@ -277,29 +623,16 @@ def main():
         print(f"Триангулировано маркеров: {len(triangulated_markers)}")
         
         # Детальная статистика по качеству
-        high_quality_markers = sum(1 for m in triangulated_markers.values() if m.triangulation_confidence >= 0.7)
-        medium_quality_markers = sum(1 for m in triangulated_markers.values() if 0.5 <= m.triangulation_confidence < 0.7)
-        low_quality_markers = sum(1 for m in triangulated_markers.values() if m.triangulation_confidence < 0.5)
+        high_quality_markers, medium_quality_markers, low_quality_markers, _ = summary
         
         print(f"\nСТАТИСТИКА КАЧЕСТВА:")
         print(f"   Маркеры - высокое: {high_quality_markers}  среднее: {medium_quality_markers}  низкое: {low_quality_markers}")
         
         print(f"\nРезультат: {OUTPUT_DIR}")
         print(f"   {os.path.basename(json_file)} - данные триангулированных маркеров")
-        print(f"")
-        print(f"Содержимое JSON:")
-        print(f"   • metadata - информация о триангуляции")
-        print(f"   • markers - 3D позиции маркеров с метаданными")
-        print(f"")
-        print(f"Структура маркера:")
-        print(f"   • id - номер маркера (1-13)")
-        print(f"   • position - [X, Y, Z] координаты в метрах")
-        print(f"   • confidence - уверенность триангуляции (0-1)")
-        print(f"   • quality - 'high'/'medium'/'low'")
-        print(f"   • reprojection_error - ошибка в пикселях")
-        print(f"   • observations_count - количество камер")
-        print(f"   • camera_ids - список ID камер")
-        print(f"")
+        # Справка по структуре JSON - одной записью
+        if VERBOSE:
+            sys.stdout.write(JSON_STRUCTURE_HELP)
         
         # Рекомендации по качеству
         if high_quality_markers >= 8:
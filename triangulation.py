@@ -27,19 +27,49 @@ class MarkerTriangulation:
 class ArUcoTriangulator:
     """Класс для 3D триангуляции ArUco маркеров"""
     
-    def __init__(self, min_cameras: int = 3, max_reprojection_error: float = 2.0):
+    # Поддерживаемые методы триангуляции
+    SOLVERS = ('pairwise', 'eigh')
+    
+    # DLT: камеры с ошибкой репроекции больше OUTLIER_FACTOR медианных (+1 пикс)
+    # считаются выбросами, и точка решается заново без них
+    OUTLIER_FACTOR = 3.0
+    
+    def __init__(self, min_cameras: int = 3, max_reprojection_error: float = 2.0,
+                 solver: str = 'pairwise', enable_logging: bool = True):
+        if solver not in self.SOLVERS:
+            raise ValueError(f"Неизвестный метод триангуляции: {solver} (доступны: {', '.join(self.SOLVERS)})")
+        
         self.min_cameras = min_cameras
         self.max_reprojection_error = max_reprojection_error
+        self.solver = solver
+        # Подробный вывод по каждому маркеру и камере; ошибки выводятся всегда
+        self.enable_logging = enable_logging
+        
+        # Матрицы проекции по camera_id: параметры камеры не зависят от маркера
+        self._projection_cache: Dict[str, np.ndarray] = {}
     
     def _create_projection_matrix(self, camera_matrix: np.ndarray, 
                                 rotation: np.ndarray, position: np.ndarray) -> np.ndarray:
         """Создание матрицы проекции P = K[R|t] для камеры"""
-        # t = -R * position (так как position - это позиция камеры в мире)
-        translation = -rotation @ position.reshape(3, 1)
-        # Создаем матрицу [R|t]
-        rt_matrix = np.hstack([rotation, translation])
-        # P = K * [R|t]
-        projection_matrix = camera_matrix @ rt_matrix
+        # t = -R * position (так как position - это позиция камеры в мире),
+        # поэтому K[R|t] = [KR | -KR * position]: без промежуточной [R|t]
+        projection_matrix = np.empty((3, 4))
+        kr = projection_matrix[:, :3]
+        np.matmul(camera_matrix, rotation, out=kr)
+        # position может прийти как (3,) или столбцом (3, 1)
+        projection_matrix[:, 3] = -(kr @ np.ravel(position))
+        return projection_matrix
+    
+    def _get_projection_matrix(self, camera_id: str, camera_data: Dict) -> np.ndarray:
+        """Матрица проекции камеры, вычисляется один раз на camera_id"""
+        projection_matrix = self._projection_cache.get(camera_id)
+        if projection_matrix is None:
+            projection_matrix = self._create_projection_matrix(
+                np.asarray(camera_data['camera_matrix']),
+                np.asarray(camera_data['rotation']),
+                np.asarray(camera_data['position'])
+            )
+            self._projection_cache[camera_id] = projection_matrix
         return projection_matrix
     
     def _triangulate_point_pair(self, p1: np.ndarray, p2: np.ndarray,
@@ -47,9 +77,9 @@ class ArUcoTriangulator:
         """Триангуляция 3D точки по двум 2D наблюдениям"""
         points_4d = cv2.triangulatePoints(
             proj1, proj2, 
-            p1.reshape(2, 1), p2.reshape(2, 1)
+            p1[:, None], p2[:, None]
         )
-        return points_4d.flatten()
+        return points_4d.ravel()
     
     def _convert_homogeneous_to_3d(self, point_4d: np.ndarray) -> np.ndarray:
         """Преобразование из однородных координат в 3D"""
@@ -57,88 +87,76 @@ class ArUcoTriangulator:
             return np.array([float('inf'), float('inf'), float('inf')])
         return point_4d[:3] / point_4d[3]
     
-    def _calculate_reprojection_error(self, point_3d: np.ndarray,
-                                    camera_matrix: np.ndarray,
-                                    rotation: np.ndarray, position: np.ndarray,
-                                    observed_2d: np.ndarray) -> float:
-        """Вычисление ошибки репроекции для 3D точки"""
-        # Преобразуем 3D точку в систему координат камеры
-        point_camera = rotation @ (point_3d - position)
-        
-        # Проецируем в 2D
-        if abs(point_camera[2]) < 1e-6:
-            return float('inf')  # Точка за камерой
-        
-        projected_2d = camera_matrix @ point_camera
-        projected_2d = projected_2d[:2] / projected_2d[2]
-        
-        # Вычисляем евклидово расстояние
-        error = np.linalg.norm(projected_2d - observed_2d)
-        return float(error)
+    def _reprojection_errors(self, projections: np.ndarray, observed_2d: np.ndarray,
+                             point_3d: np.ndarray) -> np.ndarray:
+        """
+        Ошибки репроекции 3D точки сразу для всех камер
+        
+        Parameters:
+        -----------
+        projections : np.ndarray
+            Матрицы проекции камер (K, 3, 4)
+        observed_2d : np.ndarray
+            Наблюдаемые 2D точки (K, 2)
+        point_3d : np.ndarray
+            3D точка (3,)
+            
+        Returns:
+        --------
+        np.ndarray
+            Ошибки в пикселях (K,), inf для камер, где точка в плоскости камеры
+        """
+        projected = projections @ np.append(point_3d, 1.0)
+        depth = projected[:, 2]
+        errors = np.full(len(projected), np.inf)
+        
+        # Третья строка K равна [0, 0, 1], поэтому depth - это глубина точки в системе камеры
+        valid = np.abs(depth) >= 1e-6
+        residuals = projected[valid, :2] / depth[valid, None] - observed_2d[valid]
+        errors[valid] = np.linalg.norm(residuals, axis=1)
+        return errors
     
-    def _triangulate_marker_robust(self, marker_id: int, 
-                                 observations: Dict[str, Dict]) -> Optional[MarkerTriangulation]:
-        """Робастная триангуляция одного маркера с несколькими камерами"""
-        camera_ids = list(observations.keys())
+    def _triangulate_pairwise(self, camera_ids: List[str], observed_2d: np.ndarray,
+                              projections: np.ndarray) -> Optional[np.ndarray]:
+        """Триангуляция по всем парам камер с отбрасыванием выбросов и усреднением"""
         n_cameras = len(camera_ids)
+        n_pairs = n_cameras * (n_cameras - 1) // 2
         
-        if n_cameras < self.min_cameras:
-            return None
-        
-        # Собираем все возможные пары камер для триангуляции
-        triangulated_points = []
-        projection_matrices = {}
-        
-        # Предвычисляем матрицы проекции
-        for cam_id in camera_ids:
-            cam_data = observations[cam_id]['camera_data']
-            
-            # Убеждаемся что все данные в numpy массивах
-            camera_matrix = np.array(cam_data['camera_matrix'])
-            rotation = np.array(cam_data['rotation'])
-            position = np.array(cam_data['position'])
-            
-            proj_matrix = self._create_projection_matrix(
-                camera_matrix, rotation, position
-            )
-            projection_matrices[cam_id] = proj_matrix
+        # Буфер под точки всех пар, заполняются первые n_valid строк
+        triangulated_points = np.empty((n_pairs, 3))
+        n_valid = 0
         
         # Триангулируем по всем парам камер
         for i in range(n_cameras):
             for j in range(i + 1, n_cameras):
-                cam1_id = camera_ids[i]
-                cam2_id = camera_ids[j]
-                
-                # Получаем 2D координаты
-                p1 = np.array(observations[cam1_id]['center'])
-                p2 = np.array(observations[cam2_id]['center'])
-                
                 # Триангулируем
                 try:
                     point_4d = self._triangulate_point_pair(
-                        p1, p2,
-                        projection_matrices[cam1_id],
-                        projection_matrices[cam2_id]
+                        observed_2d[i], observed_2d[j],
+                        projections[i], projections[j]
                     )
                     
                     point_3d = self._convert_homogeneous_to_3d(point_4d)
                     
                     # Проверяем на валидность
-                    if not np.any(np.isinf(point_3d)) and not np.any(np.isnan(point_3d)):
-                        triangulated_points.append(point_3d)
+                    if np.all(np.isfinite(point_3d)):
+                        triangulated_points[n_valid] = point_3d
+                        n_valid += 1
                         
                 except Exception as e:
-                    print(f"     Ошибка триангуляции пары {cam1_id}-{cam2_id}: {e}")
+                    print(f"     Ошибка триангуляции пары {camera_ids[i]}-{camera_ids[j]}: {e}")
                     continue
         
-        print(f"     Получено {len(triangulated_points)} валидных точек из {n_cameras*(n_cameras-1)//2} пар")
+        if self.enable_logging:
+            print(f"     Получено {n_valid} валидных точек из {n_pairs} пар")
         
-        if not triangulated_points:
-            print(f"     Нет валидных триангуляций")
+        if n_valid == 0:
+            if self.enable_logging:
+                print(f"     Нет валидных триангуляций")
             return None
         
         # Усредняем результаты
-        triangulated_points = np.array(triangulated_points)
+        triangulated_points = triangulated_points[:n_valid]
         
         # Удаляем выбросы (простой метод - убираем точки далеко от медианы)
         if len(triangulated_points) > 2:
@@ -149,51 +167,199 @@ class ArUcoTriangulator:
             # Оставляем точки в пределах 2 медианных отклонений
             valid_mask = distances <= (median_distance * 2 + 0.1)
             triangulated_points = triangulated_points[valid_mask]
-            print(f"     После фильтрации выбросов: {len(triangulated_points)} точек")
+            if self.enable_logging:
+                print(f"     После фильтрации выбросов: {len(triangulated_points)} точек")
         
         if len(triangulated_points) == 0:
-            print(f"     Все точки отфильтрованы как выбросы")
+            if self.enable_logging:
+                print(f"     Все точки отфильтрованы как выбросы")
             return None
         
         # Финальная 3D позиция - среднее
-        final_3d_position = np.mean(triangulated_points, axis=0)
-        print(f"     Финальная позиция: ({final_3d_position[0]:.3f}, {final_3d_position[1]:.3f}, {final_3d_position[2]:.3f})")
+        return np.mean(triangulated_points, axis=0)
+    
+    @staticmethod
+    def _solve_dlt_eigh(centers: np.ndarray, projections: np.ndarray, mask: np.ndarray) -> np.ndarray:
+        """
+        Пакетная линейная триангуляция (DLT) для нескольких маркеров
         
-        # Вычисляем ошибки репроекции для всех камер
-        reprojection_errors = []
+        Каждое наблюдение дает две строки x*P3 - P1, y*P3 - P2 матрицы A.
+        Решение - собственный вектор A^T A с наименьшим собственным числом:
+        то же, что правый сингулярный вектор A, но через eigh матриц 4x4,
+        которые решаются одним вызовом для всех маркеров.
         
-        for cam_id in camera_ids:
-            cam_data = observations[cam_id]['camera_data']
-            observed_2d = np.array(observations[cam_id]['center'])
-            
-            # Убеждаемся что данные камеры в numpy формате
-            camera_matrix = np.array(cam_data['camera_matrix'])
-            rotation = np.array(cam_data['rotation'])
-            position = np.array(cam_data['position'])
+        Parameters:
+        -----------
+        centers : np.ndarray
+            2D наблюдения (M, K, 2), K - максимальное число камер у маркера
+        projections : np.ndarray
+            Матрицы проекции (M, K, 3, 4)
+        mask : np.ndarray
+            Признак реального наблюдения (M, K); остальные позиции - дополнение
             
-            error = self._calculate_reprojection_error(
-                final_3d_position,
-                camera_matrix,
-                rotation,
-                position,
-                observed_2d
-            )
-            
-            if not np.isinf(error):
-                reprojection_errors.append(error)
-            
-            print(f"       Камера {cam_id}: ошибка {error:.2f} пикс")
+        Returns:
+        --------
+        np.ndarray
+            Однородные координаты точек (M, 4)
+        """
+        rows = np.concatenate([
+            centers[..., 0:1] * projections[..., 2, :] - projections[..., 0, :],
+            centers[..., 1:2] * projections[..., 2, :] - projections[..., 1, :]
+        ], axis=1)
+        row_mask = np.concatenate([mask, mask], axis=1)
+        
+        # Нормировка строк выравнивает вклад камер и улучшает обусловленность A^T A;
+        # строки дополнения обнуляются и не влияют на A^T A
+        norms = np.linalg.norm(rows, axis=2, keepdims=True)
+        rows = np.where(row_mask[..., None], rows / np.where(norms > 0, norms, 1.0), 0.0)
+        
+        _, eigenvectors = np.linalg.eigh(rows.transpose(0, 2, 1) @ rows)
+        return eigenvectors[:, :, 0]
+    
+    def _triangulate_dlt_eigh(self, observed_2d: np.ndarray, projections: np.ndarray) -> Optional[np.ndarray]:
+        """Линейная триангуляция (DLT) одного маркера сразу по всем камерам"""
+        n_cameras = len(observed_2d)
+        point_4d = self._solve_dlt_eigh(
+            observed_2d[None], projections[None], np.ones((1, n_cameras), dtype=bool)
+        )[0]
+        return self._accept_dlt_point(point_4d, n_cameras)
+    
+    def _triangulate_dlt_batch(self, markers_observations: Dict[int, Dict[str, Dict]],
+                               projection_matrices: Dict[str, np.ndarray]) -> Dict[int, np.ndarray]:
+        """
+        DLT для всех маркеров одним пакетом
+        
+        Наблюдения маркеров укладываются в массивы (M, K, ...) с дополнением
+        до максимального числа камер, система решается одним вызовом eigh.
+        
+        Returns:
+        --------
+        dict
+            {marker_id: однородные координаты (4,)}
+        """
+        marker_ids = list(markers_observations)
+        if not marker_ids:
+            return {}
+        
+        max_cameras = max(len(markers_observations[marker_id]) for marker_id in marker_ids)
+        centers = np.zeros((len(marker_ids), max_cameras, 2))
+        projections = np.zeros((len(marker_ids), max_cameras, 3, 4))
+        mask = np.zeros((len(marker_ids), max_cameras), dtype=bool)
+        
+        for i, marker_id in enumerate(marker_ids):
+            for k, (cam_id, observation) in enumerate(markers_observations[marker_id].items()):
+                centers[i, k] = observation['center']
+                projections[i, k] = projection_matrices[cam_id]
+                mask[i, k] = True
+        
+        points_4d = self._solve_dlt_eigh(centers, projections, mask)
+        return dict(zip(marker_ids, points_4d))
+    
+    def _reject_dlt_outliers(self, observed_2d: np.ndarray, projections: np.ndarray,
+                             point_3d: np.ndarray) -> np.ndarray:
+        """
+        Отбрасывание выбросов для DLT по ошибкам репроекции
+        
+        DLT решает систему по всем камерам сразу, поэтому одна ошибочная
+        детекция смещает всю точку. Камеры с ошибкой больше
+        OUTLIER_FACTOR * медиана + 1 пикс отбрасываются, и DLT решается
+        заново по оставшимся (не меньше двух).
+        
+        Returns:
+        --------
+        np.ndarray
+            Уточненная 3D точка, либо исходная, если выбросов нет
+        """
+        errors = self._reprojection_errors(projections, observed_2d, point_3d)
+        finite = np.isfinite(errors)
+        if not finite.any():
+            return point_3d
+        
+        threshold = self.OUTLIER_FACTOR * np.median(errors[finite]) + 1.0
+        inliers = errors <= threshold
+        n_inliers = int(np.count_nonzero(inliers))
+        if n_inliers == len(errors) or n_inliers < 2:
+            return point_3d
+        
+        if self.enable_logging:
+            print(f"     Отброшено выбросов: {len(errors) - n_inliers} (порог {threshold:.2f} пикс)")
+        
+        refined_3d = self._triangulate_dlt_eigh(observed_2d[inliers], projections[inliers])
+        return refined_3d if refined_3d is not None else point_3d
+    
+    def _accept_dlt_point(self, point_4d: np.ndarray, n_cameras: int) -> Optional[np.ndarray]:
+        """Перевод решения DLT в 3D с проверкой валидности"""
+        point_3d = self._convert_homogeneous_to_3d(point_4d)
+        
+        if not np.all(np.isfinite(point_3d)):
+            if self.enable_logging:
+                print(f"     Нет валидной триангуляции (DLT)")
+            return None
         
-        if not reprojection_errors:
-            print(f"     Нет валидных ошибок репроекции")
+        if self.enable_logging:
+            print(f"     DLT по {n_cameras} камерам")
+        return point_3d
+    
+    def _triangulate_marker_robust(self, marker_id: int, 
+                                 observations: Dict[str, Dict],
+                                 dlt_point: Optional[np.ndarray] = None) -> Optional[MarkerTriangulation]:
+        """
+        Робастная триангуляция одного маркера с несколькими камерами
+        
+        dlt_point - готовое решение DLT (однородные координаты) из пакетной
+        триангуляции; используется для solver='eigh' вместо решения по маркеру.
+        """
+        camera_ids = list(observations.keys())
+        n_cameras = len(camera_ids)
+        
+        if n_cameras < self.min_cameras:
+            return None
+        
+        # Наблюдения (N, 2) и матрицы проекции из кэша (N, 3, 4) собираются
+        # один раз и используются и для триангуляции, и для репроекции
+        observed_2d = np.array([observations[cam_id]['center'] for cam_id in camera_ids], dtype=np.float64)
+        projections = np.stack([
+            self._get_projection_matrix(cam_id, observations[cam_id]['camera_data'])
+            for cam_id in camera_ids
+        ])
+        
+        if self.solver == 'eigh':
+            if dlt_point is not None:
+                final_3d_position = self._accept_dlt_point(dlt_point, n_cameras)
+            else:
+                final_3d_position = self._triangulate_dlt_eigh(observed_2d, projections)
+            if final_3d_position is not None:
+                final_3d_position = self._reject_dlt_outliers(observed_2d, projections, final_3d_position)
+        else:
+            final_3d_position = self._triangulate_pairwise(camera_ids, observed_2d, projections)
+        
+        if final_3d_position is None:
+            return None
+        
+        if self.enable_logging:
+            print(f"     Финальная позиция: ({final_3d_position[0]:.3f}, {final_3d_position[1]:.3f}, {final_3d_position[2]:.3f})")
+        
+        # Вычисляем ошибки репроекции для всех камер одной операцией
+        errors = self._reprojection_errors(projections, observed_2d, final_3d_position)
+        
+        if self.enable_logging:
+            for cam_id, error in zip(camera_ids, errors):
+                print(f"       Камера {cam_id}: ошибка {error:.2f} пикс")
+        
+        reprojection_errors = errors[np.isfinite(errors)]
+        if reprojection_errors.size == 0:
+            if self.enable_logging:
+                print(f"     Нет валидных ошибок репроекции")
             return None
         
         avg_reprojection_error = np.mean(reprojection_errors)
-        print(f"     Средняя ошибка репроекции: {avg_reprojection_error:.2f} пикс (лимит: {self.max_reprojection_error})")
+        if self.enable_logging:
+            print(f"     Средняя ошибка репроекции: {avg_reprojection_error:.2f} пикс (лимит: {self.max_reprojection_error})")
         
         # Проверяем допустимость ошибки (поднимаем лимит до 200)
         if avg_reprojection_error > 200.0:  # Поднял до 200 пикселей
-            print(f"     Ошибка слишком велика: {avg_reprojection_error:.2f} > 200.0")
+            if self.enable_logging:
+                print(f"     Ошибка слишком велика: {avg_reprojection_error:.2f} > 200.0")
             return None
         
         # Вычисляем уверенность (чем меньше ошибка и больше камер, тем выше)
@@ -212,6 +378,9 @@ class ArUcoTriangulator:
                               marker_detections: Dict[str, Dict]) -> Dict[int, MarkerTriangulation]:
         """Триангуляция всех маркеров"""
         
+        # Кэш матриц проекции действителен только для текущего набора камер
+        self._projection_cache.clear()
+        
         # Группируем наблюдения по маркерам
         markers_observations = {}
         
@@ -232,24 +401,39 @@ class ArUcoTriangulator:
                     'camera_data': camera_data
                 }
         
-        print(f"   Анализ наблюдений:")
-        for marker_id, observations in markers_observations.items():
-            n_cams = len(observations)
-            status = "OK" if n_cams >= self.min_cameras else "NO"
-            print(f"     Маркер {marker_id}: {n_cams} камер {status}")
+        if self.enable_logging:
+            print(f"   Анализ наблюдений:")
+            for marker_id, observations in markers_observations.items():
+                n_cams = len(observations)
+                status = "OK" if n_cams >= self.min_cameras else "NO"
+                print(f"     Маркер {marker_id}: {n_cams} камер {status}")
+        
+        # Маркеры, видимые достаточным числом камер
+        eligible_markers = {
+            marker_id: observations for marker_id, observations in markers_observations.items()
+            if len(observations) >= self.min_cameras
+        }
+        
+        # Для DLT все маркеры решаются одним пакетом
+        dlt_points = {}
+        if self.solver == 'eigh':
+            try:
+                projection_matrices = {
+                    camera_id: self._get_projection_matrix(camera_id, camera_data)
+                    for camera_id, camera_data in opencv_cameras.items()
+                    if camera_id in marker_detections
+                }
+                dlt_points = self._triangulate_dlt_batch(eligible_markers, projection_matrices)
+            except Exception as e:
+                print(f"   Пакетная триангуляция не удалась ({e}), маркеры решаются по одному")
         
         # Триангулируем каждый маркер
         triangulated_markers = {}
         
-        for marker_id, observations in markers_observations.items():
-            n_cameras = len(observations)
-            
-            if n_cameras < self.min_cameras:
-                continue
-            
+        for marker_id, observations in eligible_markers.items():
             # Триангулируем маркер
             try:
-                result = self._triangulate_marker_robust(marker_id, observations)
+                result = self._triangulate_marker_robust(marker_id, observations, dlt_points.get(marker_id))
                 
                 if result is not None:
                     triangulated_markers[marker_id] = result
@@ -264,7 +448,9 @@ class ArUcoTriangulator:
 def triangulate_markers(opencv_cameras: Dict[str, Dict], 
                        marker_detections: Dict[str, Dict],
                        min_cameras: int = 3,
-                       max_reprojection_error: float = 2.0) -> Dict[int, MarkerTriangulation]:
+                       max_reprojection_error: float = 2.0,
+                       solver: str = 'pairwise',
+                       enable_logging: bool = True) -> Dict[int, MarkerTriangulation]:
     """
     Главная функция триангуляции маркеров
     
@@ -278,6 +464,11 @@ def triangulate_markers(opencv_cameras: Dict[str, Dict],
         Минимальное количество камер для триангуляции
     max_reprojection_error : float
         Максимальная допустимая ошибка репроекции
+    solver : str
+        'pairwise' - триангуляция по парам камер с фильтрацией выбросов,
+        'eigh' - DLT по всем камерам сразу (собственный вектор A^T A)
+    enable_logging : bool
+        Подробный вывод хода триангуляции по каждому маркеру
         
     Returns:
     --------
@@ -286,7 +477,9 @@ def triangulate_markers(opencv_cameras: Dict[str, Dict],
     """
     triangulator = ArUcoTriangulator(
         min_cameras=min_cameras,
-        max_reprojection_error=max_reprojection_error
+        max_reprojection_error=max_reprojection_error,
+        solver=solver,
+        enable_logging=enable_logging
     )
     
     return triangulator.triangulate_all_markers(opencv_cameras, marker_detections)
@@ -1,7 +1,49 @@
 import os
-import xml.etree.ElementTree as ET
+import sys
 import logging
-from typing import Dict, Any, Optional, List, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Dict, Any, Mapping, Optional, List, Tuple
+
+# lxml (libxml2) разбирает быстрее и отпускает GIL, что помогает потокам
+# в load_all_cameras; без него используется стандартный ElementTree
+try:
+    from lxml import etree as ET
+    LXML_AVAILABLE = True
+except ImportError:
+    import xml.etree.ElementTree as ET
+    LXML_AVAILABLE = False
+
+# Пространства имен RealityCapture XMP
+RC_NS = {
+    'rdf': 'http://www.w3.org/1999/02/22-rdf-syntax-ns#',
+    'xcr': 'http://www.capturingreality.com/ns/xcr/1.1#',
+}
+
+# Полное (Clark) имя тега, с которым сравниваются элементы при потоковом разборе
+_DESCRIPTION_TAG = f"{{{RC_NS['rdf']}}}Description"
+
+# Полные имена дочерних элементов и атрибутов xcr строятся один раз при
+# импорте, а не форматируются заново при каждом find/get
+_XCR_PREFIX = f"{{{RC_NS['xcr']}}}"
+_POSITION_TAG = _XCR_PREFIX + 'Position'
+_ROTATION_TAG = _XCR_PREFIX + 'Rotation'
+_DISTORTION_TAG = _XCR_PREFIX + 'DistortionCoeficients'
+_XCR_KEYS = {
+    name: _XCR_PREFIX + name for name in (
+        'FocalLength35mm', 'PrincipalPointU', 'PrincipalPointV', 'AspectRatio', 'Skew',
+        'DistortionModel', 'Version', 'version', 'PosePrior', 'Coordinates',
+        'CalibrationPrior', 'CalibrationGroup', 'DistortionGroup',
+        'InTexturing', 'InMeshing', 'latitude', 'longitude', 'altitude',
+    )
+}
+
+
+# Известные основные версии (первые два числа)
+_KNOWN_RC_VERSIONS = frozenset({
+    '1.0', '1.1', '1.2', '1.3', '1.4', '1.5',  # RealityCapture
+    '2.0',  # RealityScan 2.0
+})
 
 
 class SimpleXMPParser:
@@ -32,19 +74,22 @@ class SimpleXMPParser:
             Dictionary with camera parameters or ``None`` on failure.
         """
         try:
-            tree = ET.parse(xmp_path)
-            root = tree.getroot()
-
-            ns = {
-                'rdf': 'http://www.w3.org/1999/02/22-rdf-syntax-ns#',
-                'xcr': 'http://www.capturingreality.com/ns/xcr/1.1#',
-            }
-
-            desc = root.find('.//rdf:Description', ns)
+            # Потоковый разбор: дерево целиком не строится, чтение
+            # прекращается на закрытии первого rdf:Description (к этому
+            # моменту его дочерние Position/Rotation/... уже разобраны)
+            desc = None
+            with open(xmp_path, 'rb') as xmp_file:
+                for _, elem in ET.iterparse(xmp_file, events=('end',)):
+                    if elem.tag == _DESCRIPTION_TAG:
+                        desc = elem
+                        break
             if desc is None:
-                self.logger.warning(f"No rdf:Description found in {xmp_path}")
+                self.logger.warning("No rdf:Description found in %s", xmp_path)
                 return None
 
+            # Атрибуты Description читаются из одного отображения
+            attrs = desc.attrib
+
             # Извлекаем все данные
             camera_data = {
                 # Метаданные файла
@@ -52,81 +97,84 @@ class SimpleXMPParser:
                 'filename': os.path.basename(xmp_path),
                 
                 # === ВНУТРЕННИЕ ПАРАМЕТРЫ КАМЕРЫ ===
-                'focal_length': self._get_float_attribute(desc, 'FocalLength35mm', 35.0, ns),
-                'principal_point_u': self._get_float_attribute(desc, 'PrincipalPointU', 0.0, ns),
-                'principal_point_v': self._get_float_attribute(desc, 'PrincipalPointV', 0.0, ns),
-                'aspect_ratio': self._get_float_attribute(desc, 'AspectRatio', 1.0, ns),
-                'skew': self._get_float_attribute(desc, 'Skew', 0.0, ns),  # НОВОЕ
+                'focal_length': self._get_float_attribute(attrs, 'FocalLength35mm', 35.0),
+                'principal_point_u': self._get_float_attribute(attrs, 'PrincipalPointU', 0.0),
+                'principal_point_v': self._get_float_attribute(attrs, 'PrincipalPointV', 0.0),
+                'aspect_ratio': self._get_float_attribute(attrs, 'AspectRatio', 1.0),
+                'skew': self._get_float_attribute(attrs, 'Skew', 0.0),  # НОВОЕ
                 
                 # === ВНЕШНИЕ ПАРАМЕТРЫ ===
-                'position': self._parse_position(desc.find('xcr:Position', ns)),
-                'rotation': self._parse_rotation(desc.find('xcr:Rotation', ns)),
+                'position': self._parse_position(desc.find(_POSITION_TAG)),
+                'rotation': self._parse_rotation(desc.find(_ROTATION_TAG)),
                 
                 # === ПАРАМЕТРЫ ДИСТОРСИИ ===
-                'distortion_model': self._get_string_attribute(desc, 'DistortionModel', 'unknown', ns),  # НОВОЕ
-                'distortion': self._parse_distortion(desc.find('xcr:DistortionCoeficients', ns)),
+                'distortion_model': self._get_string_attribute(attrs, 'DistortionModel', 'unknown'),  # НОВОЕ
+                'distortion': self._parse_distortion(desc.find(_DISTORTION_TAG)),
                 
                 # === МЕТАДАННЫЕ КАЛИБРОВКИ ===
-                'xcr_version': self._get_string_attribute(desc, 'Version', 'unknown', ns),  # НОВОЕ
-                'realitycapture_version': self._get_string_attribute(desc, 'version', 'unknown', ns),  # НОВОЕ
-                'pose_prior': self._get_string_attribute(desc, 'PosePrior', 'unknown', ns),  # НОВОЕ
-                'coordinates': self._get_string_attribute(desc, 'Coordinates', 'unknown', ns),  # НОВОЕ
-                'calibration_prior': self._get_string_attribute(desc, 'CalibrationPrior', 'unknown', ns),  # НОВОЕ
-                'calibration_group': self._get_int_attribute(desc, 'CalibrationGroup', -1, ns),  # НОВОЕ
-                'distortion_group': self._get_int_attribute(desc, 'DistortionGroup', -1, ns),  # НОВОЕ
+                'xcr_version': self._get_string_attribute(attrs, 'Version', 'unknown'),  # НОВОЕ
+                'realitycapture_version': self._get_string_attribute(attrs, 'version', 'unknown'),  # НОВОЕ
+                'pose_prior': self._get_string_attribute(attrs, 'PosePrior', 'unknown'),  # НОВОЕ
+                'coordinates': self._get_string_attribute(attrs, 'Coordinates', 'unknown'),  # НОВОЕ
+                'calibration_prior': self._get_string_attribute(attrs, 'CalibrationPrior', 'unknown'),  # НОВОЕ
+                'calibration_group': self._get_int_attribute(attrs, 'CalibrationGroup', -1),  # НОВОЕ
+                'distortion_group': self._get_int_attribute(attrs, 'DistortionGroup', -1),  # НОВОЕ
                 
                 # === ФЛАГИ ИСПОЛЬЗОВАНИЯ ===
-                'in_texturing': self._get_bool_attribute(desc, 'InTexturing', True, ns),  # НОВОЕ
-                'in_meshing': self._get_bool_attribute(desc, 'InMeshing', True, ns),  # НОВОЕ
+                'in_texturing': self._get_bool_attribute(attrs, 'InTexturing', True),  # НОВОЕ
+                'in_meshing': self._get_bool_attribute(attrs, 'InMeshing', True),  # НОВОЕ
                 
                 # === ГЕОЛОКАЦИЯ ===
-                'latitude': self._get_string_attribute(desc, 'latitude', None, ns),  # НОВОЕ
-                'longitude': self._get_string_attribute(desc, 'longitude', None, ns),  # НОВОЕ
-                'altitude': self._parse_altitude(self._get_string_attribute(desc, 'altitude', None, ns)),  # НОВОЕ
+                'latitude': self._get_string_attribute(attrs, 'latitude', None),  # НОВОЕ
+                'longitude': self._get_string_attribute(attrs, 'longitude', None),  # НОВОЕ
+                'altitude': self._parse_altitude(self._get_string_attribute(attrs, 'altitude', None)),  # НОВОЕ
             }
+            desc.clear()
 
             # Валидация критически важных параметров
             validation_result = self._validate_camera_data(camera_data)
             camera_data['validation'] = validation_result
             
             if not validation_result['is_valid']:
-                self.logger.warning(f"Validation failed for {xmp_path}: {validation_result['errors']}")
+                self.logger.warning("Validation failed for %s: %s", xmp_path, validation_result['errors'])
 
             return camera_data
 
         except ET.ParseError as e:
-            self.logger.error(f"XML parsing error in {xmp_path}: {e}")
+            self.logger.error("XML parsing error in %s: %s", xmp_path, e)
             return None
         except Exception as e:
-            self.logger.error(f"Unexpected error parsing {xmp_path}: {e}")
+            self.logger.error("Unexpected error parsing %s: %s", xmp_path, e)
             return None
 
-    def _get_float_attribute(self, element: ET.Element, attr_name: str, default: float, ns: dict) -> float:
+    def _get_float_attribute(self, attrs: Mapping[str, str], attr_name: str, default: float) -> float:
         """Safely extract float attribute with namespace."""
         try:
-            value = element.get(f'{{{ns["xcr"]}}}{attr_name}')
+            value = attrs.get(_XCR_KEYS[attr_name])
             return float(value) if value is not None else default
         except (ValueError, TypeError):
-            self.logger.warning(f"Could not parse float attribute {attr_name}, using default {default}")
+            self.logger.warning("Could not parse float attribute %s, using default %s", attr_name, default)
             return default
 
-    def _get_string_attribute(self, element: ET.Element, attr_name: str, default: Optional[str], ns: dict) -> Optional[str]:
+    def _get_string_attribute(self, attrs: Mapping[str, str], attr_name: str, default: Optional[str]) -> Optional[str]:
         """Safely extract string attribute with namespace."""
-        value = element.get(f'{{{ns["xcr"]}}}{attr_name}')
-        return value if value is not None else default
+        value = attrs.get(_XCR_KEYS[attr_name])
+        # Значения вроде модели дисторсии и версий повторяются во всех
+        # файлах: интернирование оставляет по одному объекту на значение
+        return sys.intern(value) if value is not None else default
 
-    def _get_int_attribute(self, element: ET.Element, attr_name: str, default: int, ns: dict) -> int:
+    def _get_int_attribute(self, attrs: Mapping[str, str], attr_name: str, default: int) -> int:
         """Safely extract integer attribute with namespace."""
         try:
-            value = element.get(f'{{{ns["xcr"]}}}{attr_name}')
+            value = attrs.get(_XCR_KEYS[attr_name])
             return int(value) if value is not None else default
         except (ValueError, TypeError):
-            self.logger.warning(f"Could not parse int attribute {attr_name}, using default {default}")
+            self.logger.warning("Could not parse int attribute %s, using default %s", attr_name, default)
             return default
 
-    def _get_bool_attribute(self, element: ET.Element, attr_name: str, default: bool, ns: dict) -> bool:
+    def _get_bool_attribute(self, attrs: Mapping[str, str], attr_name: str, default: bool) -> bool:
         """Safely extract boolean attribute with namespace."""
-        value = element.get(f'{{{ns["xcr"]}}}{attr_name}')
+        value = attrs.get(_XCR_KEYS[attr_name])
         if value is not None:
             return value == '1' or value.lower() == 'true'
         return default
@@ -137,11 +185,11 @@ class SimpleXMPParser:
             try:
                 values = [float(v) for v in element.text.split()]
                 if len(values) != 3:
-                    self.logger.warning(f"Position should have 3 values, got {len(values)}")
+                    self.logger.warning("Position should have 3 values, got %s", len(values))
                     return [0.0, 0.0, 0.0]
                 return values
             except ValueError as e:
-                self.logger.warning(f"Could not parse position values: {e}")
+                self.logger.warning("Could not parse position values: %s", e)
         return [0.0, 0.0, 0.0]
 
     def _parse_rotation(self, element: Optional[ET.Element]) -> List[List[float]]:
@@ -150,7 +198,7 @@ class SimpleXMPParser:
             try:
                 values = [float(v) for v in element.text.split()]
                 if len(values) != 9:
-                    self.logger.warning(f"Rotation matrix should have 9 values, got {len(values)}")
+                    self.logger.warning("Rotation matrix should have 9 values, got %s", len(values))
                     return [[1.0, 0.0, 0.0], [0.0, 1.0, 0.0], [0.0, 0.0, 1.0]]
                 
                 # Преобразуем в матрицу 3x3
@@ -166,7 +214,7 @@ class SimpleXMPParser:
                 
                 return matrix
             except ValueError as e:
-                self.logger.warning(f"Could not parse rotation matrix: {e}")
+                self.logger.warning("Could not parse rotation matrix: %s", e)
         
         return [[1.0, 0.0, 0.0], [0.0, 1.0, 0.0], [0.0, 0.0, 1.0]]
 
@@ -176,11 +224,11 @@ class SimpleXMPParser:
             try:
                 values = [float(v) for v in element.text.split()]
                 if len(values) != 6:
-                    self.logger.warning(f"Distortion should have 6 coefficients, got {len(values)}")
+                    self.logger.warning("Distortion should have 6 coefficients, got %s", len(values))
                     return [0.0] * 6
                 return values
             except ValueError as e:
-                self.logger.warning(f"Could not parse distortion coefficients: {e}")
+                self.logger.warning("Could not parse distortion coefficients: %s", e)
         return [0.0] * 6
 
     def _parse_altitude(self, altitude_str: Optional[str]) -> Optional[float]:
@@ -190,7 +238,7 @@ class SimpleXMPParser:
                 numerator, denominator = altitude_str.split('/')
                 return float(numerator) / float(denominator)
             except (ValueError, ZeroDivisionError) as e:
-                self.logger.warning(f"Could not parse altitude {altitude_str}: {e}")
+                self.logger.warning("Could not parse altitude %s: %s", altitude_str, e)
         return None
 
     def _is_orthogonal_matrix(self, matrix: List[List[float]], tolerance: float = 1e-3) -> bool:
@@ -201,24 +249,36 @@ class SimpleXMPParser:
                    matrix[0][1] * (matrix[1][0] * matrix[2][2] - matrix[1][2] * matrix[2][0]) +
                    matrix[0][2] * (matrix[1][0] * matrix[2][1] - matrix[1][1] * matrix[2][0]))
             
-            return abs(det - 1.0) < tolerance
+            if abs(det - 1.0) >= tolerance:
+                return False
+            
+            # det = 1 не исключает сдвига/масштаба: строки R должны быть
+            # ортонормированы (R @ R.T ≈ E). Для 3x3 чистый Python быстрее
+            # вызова numpy
+            for i in range(3):
+                for j in range(i, 3):
+                    dot = sum(a * b for a, b in zip(matrix[i], matrix[j]))
+                    if abs(dot - (1.0 if i == j else 0.0)) >= tolerance:
+                        return False
+            return True
         except:
             return False
 
-    def _validate_realitycapture_version(self, version: str) -> bool:
-        """Проверка корректности версии RealityCapture/RealityScan."""
+    @staticmethod
+    @lru_cache(maxsize=64)
+    def _validate_realitycapture_version(version: str) -> bool:
+        """Проверка корректности версии RealityCapture/RealityScan.
+
+        Результат зависит только от строки версии, а различных версий в
+        наборе данных единицы, поэтому он кэшируется.
+        """
         if version == 'unknown':
             return True
-            
-        known_versions = [
-            '1.0', '1.1', '1.2', '1.3', '1.4', '1.5',  # RealityCapture
-            '2.0',  # RealityScan 2.0
-        ]
         
         # Проверяем основную версию (первые два числа)
         try:
             main_version = '.'.join(version.split('.')[:2])
-            return main_version in known_versions
+            return main_version in _KNOWN_RC_VERSIONS
         except:
             return False
 
@@ -257,44 +317,57 @@ class SimpleXMPParser:
             'warnings': warnings
         }
 
-    def load_all_cameras(self, directory: str) -> Dict[str, Dict[str, Any]]:
+    def load_all_cameras(self, directory: str,
+                         xmp_paths: Optional[List[str]] = None) -> Dict[str, Dict[str, Any]]:
         """Load all cameras from XMP files within ``directory``.
 
         Parameters
         ----------
         directory : str
             Directory containing ``*.xmp`` files.
+        xmp_paths : list of str, optional
+            Already collected XMP file paths. If ``None``, ``directory`` is scanned.
 
         Returns
         -------
         dict
             Mapping from camera id (filename without extension) to parameters.
         """
-        if not os.path.exists(directory):
-            self.logger.error(f"Directory does not exist: {directory}")
-            return {}
-
-        xmp_files = [f for f in os.listdir(directory) if f.lower().endswith('.xmp')]
+        if xmp_paths is None:
+            if not os.path.exists(directory):
+                self.logger.error("Directory does not exist: %s", directory)
+                return {}
+
+            with os.scandir(directory) as entries:
+                xmp_paths = [
+                    entry.path for entry in entries
+                    if entry.name[-4:].lower() == '.xmp' and entry.is_file()
+                ]
         
-        if not xmp_files:
-            self.logger.warning(f"No XMP files found in {directory}")
+        if not xmp_paths:
+            self.logger.warning("No XMP files found in %s", directory)
             return {}
 
-        self.logger.info(f"Found {len(xmp_files)} XMP files in {directory}")
+        self.logger.info("Found %s XMP files in %s", len(xmp_paths), directory)
 
-        for xmp_file in sorted(xmp_files):
-            xmp_path = os.path.join(directory, xmp_file)
-            data = self.parse_xmp_file(xmp_path)
+        # Файлы независимы: чтение с диска и разбор перекрываются в потоках,
+        # map сохраняет порядок файлов
+        xmp_paths = sorted(xmp_paths)
+        max_workers = min(32, (os.cpu_count() or 1) * 4, len(xmp_paths))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            parsed = list(executor.map(self.parse_xmp_file, xmp_paths))
+
+        for xmp_path, data in zip(xmp_paths, parsed):
             if data is not None:
-                camera_id = os.path.splitext(xmp_file)[0]
+                camera_id = os.path.splitext(os.path.basename(xmp_path))[0]
                 self.cameras_data[camera_id] = data
                 
                 # Логируем результаты валидации
                 validation = data['validation']
                 if validation['warnings']:
-                    self.logger.warning(f"{camera_id}: {validation['warnings']}")
+                    self.logger.warning("%s: %s", camera_id, validation['warnings'])
 
-        self.logger.info(f"Successfully loaded {len(self.cameras_data)} cameras")
+        self.logger.info("Successfully loaded %s cameras", len(self.cameras_data))
         return self.cameras_data
 
     def get_summary_stats(self) -> Dict[str, Any]:
@@ -302,29 +375,40 @@ class SimpleXMPParser:
         if not self.cameras_data:
             return {}
         
-        focal_lengths = [cam['focal_length'] for cam in self.cameras_data.values()]
-        altitudes = [cam['altitude'] for cam in self.cameras_data.values() if cam['altitude'] is not None]
-        
-        # Фильтруем версии RealityCapture - показываем только валидные
-        rc_versions = []
+        # Один проход по камерам вместо отдельного обхода на каждую статистику
+        focal_lengths = []
+        altitudes = []
+        rc_versions = set()
+        distortion_models = set()
+        coordinate_systems = set()
+        validation_errors = 0
         for cam in self.cameras_data.values():
+            focal_lengths.append(cam['focal_length'])
+            if cam['altitude'] is not None:
+                altitudes.append(cam['altitude'])
+            distortion_models.add(cam['distortion_model'])
+            coordinate_systems.add(cam['coordinates'])
+            if not cam['validation']['is_valid']:
+                validation_errors += 1
+            
+            # Фильтруем версии RealityCapture - показываем только валидные
             version = cam['realitycapture_version']
             if self._validate_realitycapture_version(version) and version != 'unknown':
-                rc_versions.append(version)
+                rc_versions.add(version)
         
         # Если нет валидных версий, не показываем их вообще
         if not rc_versions:
-            rc_versions = ['version not available']
+            rc_versions = {'version not available'}
         
         stats = {
             'total_cameras': len(self.cameras_data),
             'focal_length_range': (min(focal_lengths), max(focal_lengths)) if focal_lengths else (0, 0),
             'focal_length_mean': sum(focal_lengths) / len(focal_lengths) if focal_lengths else 0,
             'altitude_range': (min(altitudes), max(altitudes)) if altitudes else (None, None),
-            'distortion_models': list(set(cam['distortion_model'] for cam in self.cameras_data.values())),
-            'coordinate_systems': list(set(cam['coordinates'] for cam in self.cameras_data.values())),
-            'realitycapture_versions': list(set(rc_versions)),
-            'validation_errors': sum(1 for cam in self.cameras_data.values() if not cam['validation']['is_valid'])
+            'distortion_models': list(distortion_models),
+            'coordinate_systems': list(coordinate_systems),
+            'realitycapture_versions': list(rc_versions),
+            'validation_errors': validation_errors
         }
         
         return stats
@@ -333,33 +417,37 @@ class SimpleXMPParser:
         """Export summary report to text file."""
         stats = self.get_summary_stats()
         
+        # Отчет собирается в памяти и записывается одним вызовом write
+        out = []
+        out.append("=== XMP PARSER SUMMARY REPORT ===\n\n")
+        out.append(f"Total cameras loaded: {stats['total_cameras']}\n")
+        out.append(f"Validation errors: {stats['validation_errors']}\n\n")
+        
+        out.append("FOCAL LENGTHS:\n")
+        out.append(f"  Range: {stats['focal_length_range'][0]:.2f} - {stats['focal_length_range'][1]:.2f}mm\n")
+        out.append(f"  Mean: {stats['focal_length_mean']:.2f}mm\n\n")
+        
+        if stats['altitude_range'][0] is not None:
+            out.append("ALTITUDES:\n")
+            out.append(f"  Range: {stats['altitude_range'][0]:.1f} - {stats['altitude_range'][1]:.1f}m\n\n")
+        
+        out.append(f"DISTORTION MODELS: {', '.join(stats['distortion_models'])}\n")
+        out.append(f"COORDINATE SYSTEMS: {', '.join(stats['coordinate_systems'])}\n")
+        if stats['realitycapture_versions'] != ['version not available']:
+            out.append(f"REALITYCAPTURE VERSIONS: {', '.join(stats['realitycapture_versions'])}\n")
+        out.append("\n")
+        
+        out.append("PER-CAMERA DETAILS:\n")
+        for cam_id, cam_data in self.cameras_data.items():
+            out.append(f"\n{cam_id}:\n")
+            out.append(f"  Position: [{cam_data['position'][0]:.3f}, {cam_data['position'][1]:.3f}, {cam_data['position'][2]:.3f}]\n")
+            out.append(f"  Focal length: {cam_data['focal_length']:.2f}mm\n")
+            out.append(f"  Distortion model: {cam_data['distortion_model']}\n")
+            out.append(f"  Validation: {'+' if cam_data['validation']['is_valid'] else '-'}\n")
+            if cam_data['validation']['warnings']:
+                out.append(f"  Warnings: {'; '.join(cam_data['validation']['warnings'])}\n")
+
         with open(output_path, 'w', encoding='utf-8') as f:
-            f.write("=== XMP PARSER SUMMARY REPORT ===\n\n")
-            f.write(f"Total cameras loaded: {stats['total_cameras']}\n")
-            f.write(f"Validation errors: {stats['validation_errors']}\n\n")
-            
-            f.write("FOCAL LENGTHS:\n")
-            f.write(f"  Range: {stats['focal_length_range'][0]:.2f} - {stats['focal_length_range'][1]:.2f}mm\n")
-            f.write(f"  Mean: {stats['focal_length_mean']:.2f}mm\n\n")
-            
-            if stats['altitude_range'][0] is not None:
-                f.write("ALTITUDES:\n")
-                f.write(f"  Range: {stats['altitude_range'][0]:.1f} - {stats['altitude_range'][1]:.1f}m\n\n")
-            
-            f.write(f"DISTORTION MODELS: {', '.join(stats['distortion_models'])}\n")
-            f.write(f"COORDINATE SYSTEMS: {', '.join(stats['coordinate_systems'])}\n")
-            if stats['realitycapture_versions'] != ['version not available']:
-                f.write(f"REALITYCAPTURE VERSIONS: {', '.join(stats['realitycapture_versions'])}\n")
-            f.write("\n")
-            
-            f.write("PER-CAMERA DETAILS:\n")
-            for cam_id, cam_data in self.cameras_data.items():
-                f.write(f"\n{cam_id}:\n")
-                f.write(f"  Position: [{cam_data['position'][0]:.3f}, {cam_data['position'][1]:.3f}, {cam_data['position'][2]:.3f}]\n")
-                f.write(f"  Focal length: {cam_data['focal_length']:.2f}mm\n")
-                f.write(f"  Distortion model: {cam_data['distortion_model']}\n")
-                f.write(f"  Validation: {'+' if cam_data['validation']['is_valid'] else '-'}\n")
-                if cam_data['validation']['warnings']:
-                    f.write(f"  Warnings: {'; '.join(cam_data['validation']['warnings'])}\n")
+            f.write(''.join(out))
         
-        self.logger.info(f"Summary report exported to {output_path}")
\ No newline at end of file
+        self.logger.info("Summary report exported to %s", output_path)
\ No newline at end of file
@@ -93,11 +93,14 @@ class XMPToOpenCVConverter:
         cy_pixels = image_height / 2 + principal_point_v * (image_height / 2)
         
         # === СОЗДАНИЕ МАТРИЦЫ КАМЕРЫ ===
-        camera_matrix = np.array([
-            [fx_pixels,      0.0, cx_pixels],
-            [     0.0, fy_pixels, cy_pixels],
-            [     0.0,      0.0,      1.0]
-        ])
+        # [[fx, 0, cx], [0, fy, cy], [0, 0, 1]] - заполнение по индексам,
+        # без разбора вложенного списка
+        camera_matrix = np.zeros((3, 3))
+        camera_matrix[0, 0] = fx_pixels
+        camera_matrix[1, 1] = fy_pixels
+        camera_matrix[0, 2] = cx_pixels
+        camera_matrix[1, 2] = cy_pixels
+        camera_matrix[2, 2] = 1.0
         
         # === СОХРАНЯЕМ ОРИГИНАЛЬНЫЕ ДАННЫЕ ===
         position = np.array(xmp_data['position'])
@@ -149,21 +152,26 @@ class XMPToOpenCVConverter:
             Словарь {camera_id: opencv_params}
         """
         opencv_cameras = {}
+        # Сообщения копятся и выводятся одной записью после цикла
+        messages = []
         
         for camera_id, xmp_data in xmp_cameras.items():
             try:
                 opencv_params = self.convert_single_camera(camera_id, xmp_data, image_size)
                 opencv_cameras[camera_id] = opencv_params
                 
-                # Выводим предупреждения если есть
+                # Запоминаем предупреждения если есть
                 warnings = opencv_params['conversion_warnings']
                 if warnings:
-                    print(f"   Предупреждения {camera_id}: {'; '.join(warnings)}")
+                    messages.append(f"   Предупреждения {camera_id}: {'; '.join(warnings)}")
                 
             except Exception as e:
-                print(f"   Ошибка преобразования {camera_id}: {e}")
+                messages.append(f"   Ошибка преобразования {camera_id}: {e}")
                 continue
         
+        if messages:
+            print('\n'.join(messages))
+        
         return opencv_cameras
     
     def _validate_opencv_params(self, fx: float, fy: float, cx: float, cy: float,